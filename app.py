@@ -33,10 +33,9 @@ from datetime import datetime, timedelta
 import streamlit as st
 import pandas as pd
 from datetime import datetime, timedelta
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 from data_processor import DataProcessor
+from error_sink import set_error_handlers
+from sheets_metrics import sheets_metrics
 import time
 import hashlib
 import json
@@ -49,10 +48,19 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Errors and warnings from the data layer are shown on the page
+set_error_handlers(error=st.error, warning=st.warning)
+
+# Sheets requests made before a page is chosen (login, sidebar) count as the app's
+sheets_metrics.begin_scope('app')
+
 # Initialize data processor
 @st.cache_resource
 def get_data_processor():
-    return DataProcessor()
+    processor = DataProcessor()
+    # Poll the sheet in the background so reruns never wait on it
+    processor.start_background_refresh()
+    return processor
 
 processor = get_data_processor()
 
@@ -283,6 +291,13 @@ class UserManager:
         except Exception as e:
             st.error(f"Error saving users: {str(e)}")
     
+    def save_user(self, username):
+        """Save a single changed user to Google Sheets"""
+        try:
+            self.processor.gs_service.save_user(username, self.users[username])
+        except Exception as e:
+            st.error(f"Error saving user: {str(e)}")
+    
     def get_all_users(self):
         """Get all users"""
         return self.users
@@ -321,7 +336,7 @@ class UserManager:
             }
         
         self.users[username] = user_data
-        self.save_users()
+        self.save_user(username)
         return True, "User added successfully"
     
     def delete_user(self, username):
@@ -340,7 +355,7 @@ class UserManager:
         if username in self.users:
             self.users[username]['permissions'] = permissions
             self.users[username]['updated_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            self.save_users()
+            self.save_user(username)
             return True, "Permissions updated successfully"
         return False, "User not found"
     
@@ -473,11 +488,13 @@ with st.sidebar:
             nav_options.remove("Daily Reports")
     
     page = st.radio("Navigation", nav_options, label_visibility="collapsed")
+    sheets_metrics.begin_scope(f"page:{page}")
     
     st.markdown("---")
     st.markdown("### Quick Actions")
     if st.button("🔄 Refresh Data"):
         st.cache_data.clear()
+        processor.refresh_data()
         st.rerun()
     
     if st.button("🚪 Logout"):
@@ -490,6 +507,10 @@ with st.sidebar:
 
 # ==================== DASHBOARD PAGE ====================
 if page == "Dashboard":
+    # Plotly is only loaded by the pages that draw charts
+    import plotly.express as px
+    import plotly.graph_objects as go
+    
     st.markdown('<h1 class="main-header">📊 Telecaller Performance Dashboard</h1>', unsafe_allow_html=True)
     
     # Date Range Selector
@@ -523,12 +544,17 @@ if page == "Dashboard":
             st.session_state.selected_range = value
             st.rerun()
     
-    # Get dashboard stats
+    # Get dashboard stats: every range is computed at once, so switching
+    # ranges is a lookup until the data (or the day) changes
     if st.session_state.user_role == 'admin' or can_view_all_reports():
-        stats = processor.get_dashboard_stats(st.session_state.selected_range)
+        stats_telecaller = None
     else:
-        stats = processor.get_dashboard_stats(st.session_state.selected_range, 
-                                             telecaller=st.session_state.telecaller_name)
+        stats_telecaller = st.session_state.telecaller_name
+    stats_key = (processor.data_version, datetime.now().date(), stats_telecaller)
+    if st.session_state.get('dashboard_stats_key') != stats_key:
+        st.session_state.dashboard_stats = processor.get_dashboard_stats_multi(telecaller=stats_telecaller)['ranges']
+        st.session_state.dashboard_stats_key = stats_key
+    stats = st.session_state.dashboard_stats[st.session_state.selected_range]
     
     # Stats Cards
     col1, col2, col3, col4 = st.columns(4)
@@ -822,6 +848,11 @@ elif page in ["Daily Reports", "My Reports"]:
                 report_options.append(f"{date_val} - {telecaller_val} - {calls_val} calls")
                 report_indices.append(idx)
             
+            # Edits and deletes address reports by their stable ID, which survives
+            # sorting, filtering and other users' changes to the sheet
+            report_ids = {idx: (reports.loc[idx, 'ID'] if 'ID' in reports.columns else '') or int(idx)
+                          for idx in report_indices}
+            
             selected_idx = st.selectbox(
                 "Select a report to edit/delete",
                 options=range(len(report_options)),
@@ -835,7 +866,7 @@ elif page in ["Daily Reports", "My Reports"]:
             with col1:
                 if st.button("✏️ Edit Selected Report", use_container_width=True):
                     if can_edit_report(reports.loc[selected_report_index, 'Telecaller']):
-                        st.session_state.editing_report = selected_report_index
+                        st.session_state.editing_report = report_ids[selected_report_index]
                         st.session_state.edit_mode = True
                         st.session_state.editing_report_date = reports.loc[selected_report_index, 'Date']
                         st.rerun()
@@ -860,7 +891,7 @@ elif page in ["Daily Reports", "My Reports"]:
                         processor.log_edit_action(edit_log)
                         
                         # Delete report
-                        success = processor.delete_report(selected_report_index)
+                        success = processor.delete_report(report_ids[selected_report_index])
                         if success:
                             st.success("Report deleted successfully!")
                             time.sleep(1)
@@ -882,24 +913,27 @@ elif page == "Add Report":
         st.info("✏️ You are editing an existing report")
         reports = processor.get_all_reports()
         
-        # Find the report by date if index is not available
+        # Find the report by its ID, or by date if it has none
         if st.session_state.editing_report is not None:
             try:
-                if isinstance(st.session_state.editing_report, int):
-                    report_idx = st.session_state.editing_report
-                    if report_idx < len(reports):
-                        original_data = reports.iloc[report_idx]
+                report_idx = st.session_state.editing_report
+                if isinstance(report_idx, str) and 'ID' in reports.columns:
+                    matching_reports = reports[reports['ID'] == report_idx]
+                    if not matching_reports.empty:
+                        original_data = matching_reports.iloc[0]
                     else:
                         st.error("Report not found. Please select again.")
                         st.session_state.edit_mode = False
                         st.session_state.editing_report = None
                         st.rerun()
+                elif isinstance(report_idx, int) and report_idx in reports.index:
+                    original_data = reports.loc[report_idx]
                 else:
                     # Try to find by date
                     date_str = st.session_state.editing_report_date
                     matching_reports = reports[reports['Date'].dt.strftime('%Y-%m-%d') == date_str]
                     if not matching_reports.empty:
-                        report_idx = matching_reports.index[0]
+                        report_idx = int(matching_reports.index[0])
                         original_data = reports.loc[report_idx]
                         st.session_state.editing_report = report_idx
                     else:
@@ -1116,6 +1150,10 @@ elif page == "Add Report":
 
 # ==================== ANALYSIS PAGE ====================
 elif page == "Analysis":
+    import plotly.express as px
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+    
     st.markdown('<h1 class="main-header">📈 Performance Analysis</h1>', unsafe_allow_html=True)
     
     # Analysis Period Selector
@@ -1628,18 +1666,62 @@ elif page == "System Status":
                 edit_logs = processor.get_edit_logs()
                 if edit_logs is not None and not edit_logs.empty:
                     st.metric("Edit History Entries", len(edit_logs))
+                
+                memory = processor.get_memory_report()
+                col1, col2 = st.columns(2)
+                col1.metric("Bytes per Report", f"{memory['bytes_per_row_after']:,.0f}",
+                            delta=f"{memory['bytes_per_row_after'] - memory['bytes_per_row_before']:,.0f}",
+                            delta_color="inverse")
+                col2.metric("Report Data in Memory", f"{memory['bytes_after'] / 1024 / 1024:.2f} MB")
             else:
                 my_reports = reports[reports['Telecaller'] == st.session_state.telecaller_name]
                 st.metric("My Reports", len(my_reports))
         else:
             st.info("No data available")
     
+    if st.session_state.user_role == 'admin':
+        st.markdown("---")
+        st.markdown("### Sheets API Usage")
+        usage = sheets_metrics.by_source()
+        if usage:
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Sheets Requests", f"{sum(u['requests'] for u in usage):,}")
+            col2.metric("Quota Errors (429)", f"{sum(u['quota_errors'] for u in usage):,}")
+            col3.metric("Other Errors", f"{sum(u['errors'] for u in usage):,}")
+            
+            started = datetime.fromtimestamp(sheets_metrics.started_at).strftime('%Y-%m-%d %H:%M:%S')
+            st.caption(f"Since {started}. A run is one page rerun or API request; "
+                       "write-behind counts the background report and edit-log appends.")
+            st.dataframe(pd.DataFrame(usage), use_container_width=True, hide_index=True)
+            
+            with st.expander("By method and worksheet"):
+                series = pd.DataFrame(sheets_metrics.snapshot()['series']).drop(columns=['buckets'])
+                st.dataframe(series, use_container_width=True, hide_index=True)
+            
+            if st.button("Reset Counters"):
+                sheets_metrics.reset()
+                st.rerun()
+        else:
+            st.info("No Sheets API requests recorded yet")
+        
+        if processor.refresher is not None:
+            refresher = processor.refresher.status()
+            last_change = (datetime.fromtimestamp(refresher['last_change']).strftime('%H:%M:%S')
+                           if refresher['last_change'] else 'never')
+            st.caption(f"Background refresh every {refresher['interval']:g}s: {refresher['polls']} polls, "
+                       f"{refresher['refreshes']} changes, last change at {last_change}")
+            if refresher['last_error']:
+                st.warning(f"Last background refresh failed: {refresher['last_error']}")
+    
     st.markdown("---")
     st.markdown("### System Actions")
     
     col1, col2, col3 = st.columns(3)
     with col1:
         if st.button("🔄 Refresh All Data", use_container_width=True):
+            processor.refresh_data()
+            # The next rerun builds a new processor; this one must let go of its write queue
+            processor.close()
             st.cache_data.clear()
             st.cache_resource.clear()
             st.success("All caches cleared!")
@@ -1650,6 +1732,8 @@ elif page == "System Status":
             st.rerun()
     with col3:
         if st.button("🧹 Clear Cache", use_container_width=True):
+            # The next rerun builds a new processor; this one must let go of its write queue
+            processor.close()
             st.cache_data.clear()
             st.cache_resource.clear()
             st.success("Cache cleared!")
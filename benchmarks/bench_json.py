@@ -0,0 +1,64 @@
+"""Micro-benchmark: stdlib json vs fast_json on a report-records payload.
+
+Run from the repository root:  python benchmarks/bench_json.py [--records 10000]
+"""
+import argparse
+import json
+import sys
+import timeit
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import fast_json  # noqa: E402
+
+
+def make_payload(n):
+    """Build n report records the way the API hands them to the encoder"""
+    rng = np.random.default_rng(0)
+    dates = pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 700, n), unit='D')
+    df = pd.DataFrame({
+        'Date': dates,
+        'Telecaller': rng.choice(['Prakriti', 'Raphiya', 'Sudikshya', 'Shiru'], n),
+        'Total Calls': rng.integers(0, 200, n),
+        'New Data': rng.integers(0, 60, n),
+        'CRM Data': rng.integers(0, 100, n),
+        'Video': rng.choice(['Yes', 'No'], n),
+        'Remarks': rng.choice(['', 'good day', 'call backs'], n),
+    })
+    records = df.to_dict('records')
+    # Values pulled out of frames one by one arrive as numpy scalars
+    for record in records:
+        record['Visited Students'] = np.int64(record['New Data'] % 7)
+    return records
+
+
+def stdlib_dumps(obj):
+    """What the API did before: the stdlib encoder with a fallback for non-JSON types"""
+    return json.dumps(obj, default=fast_json._default).encode('utf-8')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--records', type=int, default=10_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    payload = make_payload(args.records)
+    assert json.loads(stdlib_dumps(payload)) == json.loads(fast_json.dumps_bytes(payload))
+
+    encoder = 'orjson' if fast_json.orjson is not None else 'stdlib fallback'
+    print(f"{args.records} records, best of {args.repeat}; fast_json is using {encoder}")
+    results = {}
+    for name, fn in [('stdlib json', stdlib_dumps), ('fast_json', fast_json.dumps_bytes)]:
+        best = min(timeit.repeat(lambda: fn(payload), number=1, repeat=args.repeat))
+        results[name] = best
+        print(f"  {name:<12} {best * 1000:8.1f} ms")
+    print(f"  speedup      {results['stdlib json'] / results['fast_json']:8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
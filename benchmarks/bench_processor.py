@@ -0,0 +1,156 @@
+"""Analytics benchmark: DataProcessor latency and peak memory as the Reports sheet grows.
+
+The processor runs against an in-memory stand-in for the sheet, fed with
+synthetic reports (same seed every run). Run from the repository root:
+
+    python benchmarks/bench_processor.py [--sizes 10000 100000 1000000]
+    python benchmarks/bench_processor.py --save benchmarks/processor_baseline.json
+    python benchmarks/bench_processor.py --compare benchmarks/processor_baseline.json
+
+--compare exits with status 1 when a method got slower or needs more
+memory than the baseline allows.
+"""
+import argparse
+import gc
+import json
+import math
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from data_processor import DataProcessor  # noqa: E402
+from synthetic_data import StaticReportsService, generate_reports  # noqa: E402
+
+SIZES = [10_000, 100_000, 1_000_000]
+
+# Two years of history; the telecaller count grows with the size
+HISTORY_DAYS = 730
+
+METHODS = [
+    ('get_all_reports', lambda p: p.get_all_reports()),
+    ('get_dashboard_stats', lambda p: p.get_dashboard_stats('month')),
+    ('get_performance_trend', lambda p: p.get_performance_trend(30)),
+    ('get_telecaller_performance', lambda p: p.get_telecaller_performance()),
+    ('get_video_activities', lambda p: p.get_video_activities(30)),
+    ('get_country_distribution', lambda p: p.get_country_distribution()),
+]
+
+# Latency changes below this many milliseconds are treated as noise
+MIN_DELTA_MS = 2.0
+
+
+def make_reports(rows, seed):
+    """Generate exactly rows synthetic reports"""
+    telecallers = math.ceil(rows / (HISTORY_DAYS * 0.9))
+    return generate_reports(telecallers=telecallers, days=HISTORY_DAYS, seed=seed).iloc[:rows]
+
+
+def make_processor(reports):
+    return DataProcessor(gs_service=StaticReportsService(reports), use_snapshot=False)
+
+
+def time_method(reports, call, repeat, cold_runs):
+    """Return (cold_ms, warm_ms): the best first call on a fresh processor, then the median repeated call"""
+    cold = None
+    for _ in range(cold_runs):
+        processor = make_processor(reports)
+        start = time.perf_counter()
+        call(processor)
+        elapsed = time.perf_counter() - start
+        cold = elapsed if cold is None else min(cold, elapsed)
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        call(processor)
+        samples.append(time.perf_counter() - start)
+    return cold * 1000, statistics.median(samples) * 1000
+
+
+def peak_memory(reports, call):
+    """Return the peak MiB allocated by a cold call, excluding the report frame itself"""
+    processor = make_processor(reports)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        call(processor)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 2 ** 20
+
+
+def run(sizes, repeat, cold_runs, seed):
+    results = {}
+    for rows in sizes:
+        reports = make_reports(rows, seed)
+        results[str(rows)] = {}
+        for name, call in METHODS:
+            cold, warm = time_method(reports, call, repeat, cold_runs)
+            mib = peak_memory(reports, call)
+            results[str(rows)][name] = {'cold_ms': round(cold, 2), 'warm_ms': round(warm, 3),
+                                        'peak_mib': round(mib, 2)}
+            print(f"{rows:>9,} {name:<28} cold {cold:9.1f} ms  warm {warm:9.3f} ms  peak {mib:8.1f} MiB")
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """List the measurements that regressed by more than tolerance against the baseline"""
+    regressions = []
+    for rows, methods in results.items():
+        for name, now in methods.items():
+            before = baseline.get(rows, {}).get(name)
+            if not before:
+                continue
+            for key in ('cold_ms', 'warm_ms', 'peak_mib'):
+                limit = before[key] * (1 + tolerance)
+                if key != 'peak_mib':
+                    limit = max(limit, before[key] + MIN_DELTA_MS)
+                if now[key] > limit:
+                    regressions.append(f"{int(rows):,} rows {name} {key}: {before[key]} -> {now[key]}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES, help='report counts to benchmark')
+    parser.add_argument('--repeat', type=int, default=5, help='warm calls per method (median is kept)')
+    parser.add_argument('--cold-runs', type=int, default=3, help='fresh processors per method (best is kept)')
+    parser.add_argument('--seed', type=int, default=42, help='synthetic data seed')
+    parser.add_argument('--save', metavar='PATH', help='write the results as a JSON baseline')
+    parser.add_argument('--compare', metavar='PATH', help='fail on regressions against a JSON baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed slowdown or memory growth as a fraction (default 0.25)')
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.repeat, args.cold_runs, args.seed)
+
+    if args.save:
+        baseline = {
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'repeat': args.repeat,
+            'cold_runs': args.cold_runs,
+            'seed': args.seed,
+            'results': results,
+        }
+        Path(args.save).write_text(json.dumps(baseline, indent=2) + '\n')
+        print(f"Baseline written to {args.save}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        regressions = compare(results, baseline['results'], args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"No regressions beyond {args.tolerance:.0%} against {args.compare}")
+
+
+if __name__ == '__main__':
+    main()
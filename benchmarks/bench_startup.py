@@ -0,0 +1,66 @@
+"""Startup benchmark: cold import time of the app's entry modules.
+
+Each module is imported in a fresh interpreter, so every run is a cold
+start. Run from the repository root:  python benchmarks/bench_startup.py
+"""
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Entry points: (label, extra sys.path entry, module)
+TARGETS = [
+    ('data layer', '', 'data_processor'),
+    ('sheets service', '', 'google_sheets_service'),
+    ('mock processor', '', 'mock_processor'),
+    ('netlify function', 'netlify/functions', 'api'),
+    ('flask server', '', 'server'),
+]
+
+# Heavy dependencies the core should only load when it really needs them
+HEAVY_MODULES = ['streamlit', 'gspread', 'google.oauth2', 'plotly', 'flask', 'pandas', 'pyarrow']
+
+PROBE = """
+import json, sys, time
+sys.path[:0] = {paths!r}
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'loaded': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(extra_path, module, runs):
+    """Import a module in fresh interpreters; returns the best time and the heavy modules it loaded"""
+    paths = [str(ROOT)] + ([str(ROOT / extra_path)] if extra_path else [])
+    code = PROBE.format(paths=paths, module=module, heavy=HEAVY_MODULES)
+    best, loaded = None, []
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True)
+        if result.returncode != 0:
+            return None, result.stderr.strip().splitlines()[-1:]
+        sample = json.loads(result.stdout.strip().splitlines()[-1])
+        if best is None or sample['seconds'] < best:
+            best, loaded = sample['seconds'], sample['loaded']
+    return best, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=3, help='fresh interpreters per module (best is kept)')
+    args = parser.parse_args()
+
+    print(f"{'entry point':<18} {'import':>9}  heavy modules loaded")
+    for label, extra_path, module in TARGETS:
+        seconds, loaded = measure(extra_path, module, args.runs)
+        if seconds is None:
+            print(f"{label:<18} {'failed':>9}  {' '.join(loaded)}")
+            continue
+        print(f"{label:<18} {seconds * 1000:7.0f} ms  {', '.join(loaded) or '-'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -29,122 +29,291 @@ class DataProcessor:
         # Rest of your initialization...
 
 # data_processor.py
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 from google_sheets_service import GoogleSheetsService
-import streamlit as st
+from search_index import ReportSearchIndex
+from report_snapshot import default_snapshot_path, load_snapshot, write_snapshot
+from report_schema import memory_report
+from error_sink import report_error
+from profiling import span
+from report_refresher import REPORTS_REFRESH_SECONDS, ReportRefresher
 import json
+import threading
+
+# Measures summed into the daily (date x telecaller) aggregate cube
+CUBE_MEASURES = ['Total Calls', 'New Data', 'CRM Data', 'Fair Data', 'Visited Students',
+                 'Video Count', 'Country Count']
+
+# Time ranges offered by the dashboard, in display order
+DASHBOARD_RANGES = ['today', 'yesterday', 'week', 'month', 'all']
 
 class DataProcessor:
-    def __init__(self):
-        """Initialize the DataProcessor with Google Sheets integration"""
-        self.gs_service = GoogleSheetsService()
+    def __init__(self, gs_service=None, use_snapshot=True):
+        """Initialize the DataProcessor with Google Sheets integration (or a stand-in service)"""
+        self.gs_service = gs_service if gs_service is not None else GoogleSheetsService()
+        self.snapshot_path = default_snapshot_path() if use_snapshot else None
+        self._snapshot_epoch = None
+        self._load_snapshot()
+        self._reports = None
+        self._reports_version = None
+        self._cube = None
+        self._cube_version = None
+        self._search_index = None
+        # Serializes index builds between request threads and the refresher
+        self._search_lock = threading.Lock()
+        self._search_version = None
+        self._search_epoch = None
+        self._search_next_row = 0
+        self.refresher = None
     
     def add_report(self, report_data):
         """Add a new report"""
         try:
             return self.gs_service.add_report(report_data)
         except Exception as e:
-            st.error(f"Error adding report: {str(e)}")
+            report_error(f"Error adding report: {str(e)}")
             return False
     
+    @property
+    def data_version(self):
+        """Version of the report data currently cached by the sheets service"""
+        return self.gs_service.get_reports_version()
+    
+    def refresh_data(self):
+        """Fetch fresh report data now with the background refresher, or force the next read to"""
+        if self.refresher is not None:
+            try:
+                self.refresher.refresh_now()
+            except Exception as e:
+                report_error(f"Error refreshing reports: {str(e)}")
+        else:
+            self.gs_service.invalidate_reports_cache()
+    
+    def start_background_refresh(self, interval=None):
+        """Keep reports and aggregates current from a background thread; returns the refresher, or None if disabled or offline"""
+        interval = REPORTS_REFRESH_SECONDS if interval is None else interval
+        if self.refresher is None and interval > 0 and getattr(self.gs_service, 'spreadsheet', None):
+            self.refresher = ReportRefresher(self, interval).start()
+        return self.refresher
+    
+    def stop_background_refresh(self):
+        """Stop the background refresher, if one is running"""
+        if self.refresher is not None:
+            self.refresher.stop()
+            self.refresher = None
+    
+    def close(self):
+        """Stop background work and write queued rows before this processor is discarded"""
+        self.stop_background_refresh()
+        self.gs_service.close()
+    
+    def publish_reports(self, poll):
+        """Build the sorted frame and daily cube for a polled Reports sheet, then publish them with it.
+        
+        Returns False if local writes made the poll stale before it could be published.
+        """
+        df = poll.df
+        reports = self._prepare_reports(df)
+        cube = self._build_daily_cube(reports)
+        
+        def install(version):
+            self._reports, self._reports_version = reports, version
+            self._cube, self._cube_version = cube, version
+        if not self.gs_service.publish_reports(df, on_publish=install, poll=poll):
+            return False
+        if self.snapshot_path and not df.empty:
+            write_snapshot(df, self.snapshot_path)
+        if self._search_index is not None:
+            # Rebuild search here too rather than on the next search request
+            self._get_search_index()
+        return True
+    
     def get_all_reports(self, filters=None):
         """Get all reports with optional filters"""
         try:
-            df = self.gs_service.get_all_reports()
-            
-            if df.empty:
-                return df
-            
-            # Convert Date column to datetime
-            if 'Date' in df.columns:
-                df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
-                df = df.dropna(subset=['Date'])
-            
-            # Convert numeric columns
-            numeric_cols = ['Total Calls', 'New Data', 'CRM Data', 'Fair Data', 'Visited Students']
-            for col in numeric_cols:
-                if col in df.columns:
-                    df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(int)
-            
-            # Apply filters
-            if filters:
-                if 'start_date' in filters and filters['start_date']:
-                    df = df[df['Date'].dt.date >= filters['start_date']]
-                if 'end_date' in filters and filters['end_date']:
-                    df = df[df['Date'].dt.date <= filters['end_date']]
-                if 'telecaller' in filters and filters['telecaller'] and filters['telecaller'] != 'All':
-                    df = df[df['Telecaller'] == filters['telecaller']]
-                if 'video' in filters and filters['video'] != 'All':
-                    df = df[df['Video'] == filters['video']]
-                if 'search' in filters and filters['search']:
-                    search_term = filters['search'].lower()
-                    mask = df.astype(str).apply(lambda x: x.str.lower().str.contains(search_term, na=False)).any(axis=1)
-                    df = df[mask]
-            
-            return df.sort_values('Date', ascending=False)
+            # The frame is kept in ascending date order, so newest-first is a reversal
+            return self._filter_reports(filters).iloc[::-1].copy()
         except Exception as e:
-            st.error(f"Error fetching reports: {str(e)}")
+            report_error(f"Error fetching reports: {str(e)}")
+            return pd.DataFrame()
+    
+    def iter_reports(self, filters=None, chunk_rows=5000):
+        """Yield filtered reports newest first, in frames of at most chunk_rows rows"""
+        df = self._filter_reports(filters)
+        for end in range(len(df), 0, -chunk_rows):
+            yield df.iloc[max(0, end - chunk_rows):end].iloc[::-1]
+    
+    def _filter_reports(self, filters=None):
+        """Get the date-sorted report frame narrowed by filters, without copying it"""
+        df = self._get_sorted_reports()
+        
+        if df.empty or not filters:
+            return df
+        
+        with span('filter'):
+            lo, hi = _day_bounds(df['Date'].values, filters.get('start_date'), filters.get('end_date'))
+            df = df.iloc[lo:hi]
+            if 'telecaller' in filters and filters['telecaller'] and filters['telecaller'] != 'All':
+                df = df[df['Telecaller'] == filters['telecaller']]
+            if 'video' in filters and filters['video'] != 'All':
+                df = df[df['Video'] == filters['video']]
+            if 'search' in filters and filters['search']:
+                matches = self._get_search_index().search(filters['search'])
+                df = df[df.index.isin(list(matches))]
+            return df
+    
+    def _get_sorted_reports(self):
+        """Get the parsed report frame for the current data version, sorted by Date"""
+        version = self.data_version
+        if self._reports is None or self._reports_version != version:
+            with span('fetch'):
+                df = self.gs_service.get_all_reports()
+            # Local appends keep the epoch, so they never rewrite the whole
+            # snapshot here; a running refresher writes it when it publishes
+            epoch = self.gs_service.reports_epoch
+            if self.snapshot_path and not df.empty and self.refresher is None and epoch != self._snapshot_epoch:
+                with span('snapshot'):
+                    write_snapshot(df, self.snapshot_path)
+                self._snapshot_epoch = epoch
+            with span('parse'):
+                self._reports = self._prepare_reports(df)
+            self._reports_version = version
+        return self._reports
+    
+    def _load_snapshot(self):
+        """Seed the report cache from the on-disk snapshot so startup skips the sheet fetch"""
+        if not self.snapshot_path:
+            return
+        df = load_snapshot(self.snapshot_path)
+        if df is not None:
+            self.gs_service.seed_reports(df)
+            # Already on disk
+            self._snapshot_epoch = self.gs_service.reports_epoch
+    
+    def _get_search_index(self):
+        """Get the text search index for the current data version"""
+        df = self._get_sorted_reports()
+        if self._search_index is not None and self._search_version == self._reports_version:
+            return self._search_index
+        
+        with self._search_lock:
+            if self._search_index is not None and self._search_version == self._reports_version:
+                return self._search_index
+            
+            epoch = self.gs_service.reports_epoch
+            if self._search_index is None or self._search_epoch != epoch:
+                # Built aside and swapped in whole, so searches never see it half-filled
+                index = ReportSearchIndex()
+                index.add_rows(df)
+                self._search_index = index
+            else:
+                # Reports added since the last build only append rows, so index just those
+                self._search_index.add_rows(df[df.index >= self._search_next_row])
+            if not df.empty:
+                self._search_next_row = int(df.index.max()) + 1
+            self._search_version = self._reports_version
+            self._search_epoch = epoch
+            return self._search_index
+    
+    def _prepare_reports(self, df):
+        """Drop undated rows and sort ascending by Date for range slicing"""
+        if df.empty or 'Date' not in df.columns:
             return pd.DataFrame()
+        
+        # Types were already applied by the sheets service when the data was loaded
+        df = df.dropna(subset=['Date'])
+        
+        # Same-day rows end up in sheet order once the frame is read newest-first
+        return df.iloc[::-1].sort_values('Date', kind='stable')
     
-    def update_report(self, index, report_data):
-        """Update an existing report"""
+    def update_report(self, report_id, report_data):
+        """Update an existing report by its ID"""
         try:
-            return self.gs_service.update_report(index, report_data)
+            return self.gs_service.update_report(report_id, report_data)
         except Exception as e:
-            st.error(f"Error updating report: {str(e)}")
+            report_error(f"Error updating report: {str(e)}")
             return False
     
-    def delete_report(self, index):
-        """Delete a report"""
+    def delete_report(self, report_id):
+        """Delete a report by its ID"""
         try:
-            return self.gs_service.delete_report(index)
+            return self.gs_service.delete_report(report_id)
         except Exception as e:
-            st.error(f"Error deleting report: {str(e)}")
+            report_error(f"Error deleting report: {str(e)}")
             return False
     
-    def get_dashboard_stats(self, time_range='today', telecaller=None):
-        """Get dashboard statistics"""
-        df = self.get_all_reports()
-        
+    def get_daily_cube(self):
+        """Get the (date x telecaller) aggregate cube for the current data version"""
+        version = self.data_version
+        if self._cube is None or self._cube_version != version:
+            df = self._get_sorted_reports()
+            with span('aggregate'):
+                self._cube = self._build_daily_cube(df)
+            self._cube_version = version
+        return self._cube
+    
+    def _build_daily_cube(self, df):
+        """Aggregate report rows into one row per date and telecaller"""
+        columns = ['Date', 'Telecaller'] + CUBE_MEASURES
         if df.empty:
-            return {
-                'total_calls': 0, 'new_data': 0, 'crm_data': 0, 'video_activities': 0,
-                'country_data': 0, 'country_data_count': 0, 'fair_data': 0, 'visited_students': 0,
-                'avg_calls_per_day': 0, 'avg_new_data_per_day': 0,
-                'crm_completion_rate': 0, 'conversion_rate': 0
-            }
+            return pd.DataFrame(columns=columns)
+        
+        rows = pd.DataFrame({
+            'Date': df['Date'].dt.normalize(),
+            'Telecaller': df['Telecaller'] if 'Telecaller' in df.columns else '',
+        })
+        for col in CUBE_MEASURES[:5]:
+            rows[col] = df[col] if col in df.columns else 0
+        rows['Video Count'] = (df['Video'] == 'Yes').astype(int) if 'Video' in df.columns else 0
+        if 'Country Data' in df.columns:
+            rows['Country Count'] = (df['Country Data'].notna() & (df['Country Data'] != '')).astype(int)
+        else:
+            rows['Country Count'] = 0
         
+        cube = rows.groupby(['Date', 'Telecaller'], sort=True, dropna=False, observed=True)[CUBE_MEASURES].sum()
+        return cube.reset_index()[columns]
+    
+    def _slice_cube(self, start=None, end=None, telecaller=None):
+        """Slice the daily cube by an inclusive date window and telecaller"""
+        cube = self.get_daily_cube()
+        if cube.empty:
+            return cube
+        lo, hi = _day_bounds(cube['Date'].values, start, end)
+        cube = cube.iloc[lo:hi]
         if telecaller:
-            df = df[df['Telecaller'] == telecaller]
-        
+            cube = cube[cube['Telecaller'] == telecaller]
+        return cube
+    
+    def _range_window(self, time_range):
+        """Resolve a dashboard time range name to an inclusive (start, end) date window"""
         today = datetime.now().date()
-        
         if time_range == 'today':
-            df = df[df['Date'].dt.date == today]
-        elif time_range == 'yesterday':
+            return today, today
+        if time_range == 'yesterday':
             yesterday = today - timedelta(days=1)
-            df = df[df['Date'].dt.date == yesterday]
-        elif time_range == 'week':
-            week_ago = today - timedelta(days=7)
-            df = df[df['Date'].dt.date >= week_ago]
-        elif time_range == 'month':
-            month_ago = today - timedelta(days=30)
-            df = df[df['Date'].dt.date >= month_ago]
-        
-        total_calls = df['Total Calls'].sum() if not df.empty else 0
-        new_data = df['New Data'].sum() if not df.empty else 0
-        crm_data = df['CRM Data'].sum() if not df.empty else 0
-        video_activities = df[df['Video'] == 'Yes'].shape[0] if not df.empty else 0
-        
-        # Country data - count of non-empty country entries
-        country_data_count = df['Country Data'].notna() & (df['Country Data'] != '') if not df.empty else 0
-        country_data_count = country_data_count.sum() if not isinstance(country_data_count, int) else 0
-        
-        fair_data = df['Fair Data'].sum() if not df.empty else 0
-        visited_students = df['Visited Students'].sum() if not df.empty else 0
+            return yesterday, yesterday
+        if time_range == 'week':
+            return today - timedelta(days=7), None
+        if time_range == 'month':
+            return today - timedelta(days=30), None
+        return None, None
+    
+    def _stats_from_cube(self, cube):
+        """Compute dashboard statistics from a slice of the daily cube"""
+        totals = cube[CUBE_MEASURES].sum() if not cube.empty else pd.Series(0, index=CUBE_MEASURES)
+        num_days = cube['Date'].nunique() if not cube.empty else 1
+        return self._stats_from_totals(totals.to_numpy().tolist(), int(num_days))
+    
+    def _stats_from_totals(self, totals, num_days):
+        """Compute dashboard statistics from measure totals (in CUBE_MEASURES order) and a day count"""
+        totals = dict(zip(CUBE_MEASURES, totals))
+        total_calls = int(totals['Total Calls'])
+        new_data = int(totals['New Data'])
+        crm_data = int(totals['CRM Data'])
+        country_data_count = int(totals['Country Count'])
         
-        num_days = len(df['Date'].dt.date.unique()) if not df.empty else 1
         avg_calls_per_day = total_calls / num_days if num_days > 0 else 0
         avg_new_data_per_day = new_data / num_days if num_days > 0 else 0
         
@@ -155,138 +324,179 @@ class DataProcessor:
             'total_calls': total_calls,
             'new_data': new_data,
             'crm_data': crm_data,
-            'video_activities': video_activities,
+            'video_activities': int(totals['Video Count']),
             'country_data': country_data_count,
             'country_data_count': country_data_count,
-            'fair_data': fair_data,
-            'visited_students': visited_students,
+            'fair_data': int(totals['Fair Data']),
+            'visited_students': int(totals['Visited Students']),
             'avg_calls_per_day': round(avg_calls_per_day, 1),
             'avg_new_data_per_day': round(avg_new_data_per_day, 1),
             'crm_completion_rate': round(crm_completion_rate, 1),
             'conversion_rate': round(conversion_rate, 1)
         }
     
-    def get_weekly_summary(self, telecaller=None):
-        """Get weekly performance summary"""
-        df = self.get_all_reports()
-        
-        if df.empty:
-            return []
-        
-        if telecaller:
-            df = df[df['Telecaller'] == telecaller]
-        
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=7)
-        
-        df_week = df[(df['Date'] >= start_date) & (df['Date'] <= end_date)]
-        
-        if df_week.empty:
+    def get_dashboard_stats(self, time_range='today', telecaller=None):
+        """Get dashboard statistics"""
+        start, end = self._range_window(time_range)
+        cube = self._slice_cube(start, end, telecaller)
+        with span('aggregate'):
+            return self._stats_from_cube(cube)
+    
+    def get_dashboard_stats_multi(self, telecaller=None, by_telecaller=False):
+        """Get dashboard statistics for every time range in one pass over the daily cube.
+        
+        Returns {'ranges': {range: stats}}; with by_telecaller there is also a
+        'telecallers' entry of {telecaller: {range: stats}}.
+        """
+        cube = self.get_daily_cube()
+        with span('aggregate'):
+            if telecaller:
+                cube = cube[cube['Telecaller'] == telecaller]
+            
+            n = len(cube)
+            dates = cube['Date'].to_numpy(dtype='datetime64[ns]')
+            values = cube[CUBE_MEASURES].to_numpy(dtype='int64')
+            bounds = np.array([_day_bounds(dates, *self._range_window(r)) for r in DASHBOARD_RANGES],
+                              dtype='int64').reshape(len(DASHBOARD_RANGES), 2)
+            lo, hi = bounds[:, 0], bounds[:, 1]
+            
+            # Every range is a contiguous slice of the date-sorted cube, so prefix
+            # sums give each range's totals with one subtraction
+            prefix = np.zeros((n + 1, len(CUBE_MEASURES)), dtype='int64')
+            prefix[1:] = values.cumsum(axis=0)
+            new_day = np.ones(n, dtype=bool)
+            new_day[1:] = dates[1:] != dates[:-1]
+            day_prefix = np.concatenate([[0], new_day.cumsum()])
+            
+            totals = prefix[hi] - prefix[lo]
+            days = day_prefix[hi] - day_prefix[lo]
+            # Plain ints, so averages round exactly as in get_dashboard_stats
+            result = {'ranges': {r: self._stats_from_totals(totals[i].tolist(), int(days[i]))
+                                 for i, r in enumerate(DASHBOARD_RANGES)}}
+            
+            if by_telecaller:
+                # One bincount per measure over each range's slice, so the work
+                # is linear in the cube; the extra last measure counts cube rows,
+                # which is that telecaller's number of report days
+                codes, names = pd.factorize(np.asarray(cube['Telecaller'], dtype=object), sort=True)
+                weights = np.column_stack([values, np.ones(n, dtype='int64')])
+                tc_totals = np.zeros((len(DASHBOARD_RANGES), len(names), weights.shape[1]), dtype='int64')
+                for i in range(len(DASHBOARD_RANGES)):
+                    range_codes = codes[lo[i]:hi[i]]
+                    for j in range(weights.shape[1]):
+                        tc_totals[i, :, j] = np.bincount(range_codes, weights=weights[lo[i]:hi[i], j],
+                                                         minlength=len(names))
+                result['telecallers'] = {
+                    name: {r: self._stats_from_totals(tc_totals[i, j, :-1].tolist(), int(tc_totals[i, j, -1]))
+                           for i, r in enumerate(DASHBOARD_RANGES)}
+                    for j, name in enumerate(names)
+                }
+            
+            return result
+    
+    def _daily_totals(self, days, telecaller=None):
+        """Get per-day call and new data totals for the last `days` days"""
+        now = datetime.now()
+        # Reports are stamped just after midnight, so the first partial day is excluded
+        start = (now - timedelta(days=days)).date() + timedelta(days=1)
+        cube = self._slice_cube(start, now.date(), telecaller)
+        
+        if cube.empty:
             return []
         
-        daily_stats = df_week.groupby(df_week['Date'].dt.date).agg({
-            'Total Calls': 'sum',
-            'New Data': 'sum'
-        }).reset_index()
-        
-        daily_stats['date'] = pd.to_datetime(daily_stats['Date']).dt.strftime('%Y-%m-%d')
-        daily_stats = daily_stats.sort_values('Date')
+        with span('aggregate'):
+            daily_stats = cube.groupby('Date')[['Total Calls', 'New Data']].sum().reset_index()
+            daily_stats['date'] = daily_stats['Date'].dt.strftime('%Y-%m-%d')
+            daily_stats['Date'] = daily_stats['Date'].dt.date
         
         return daily_stats.to_dict('records')
     
+    def get_weekly_summary(self, telecaller=None):
+        """Get weekly performance summary"""
+        return self._daily_totals(7, telecaller)
+    
     def get_performance_trend(self, days=30, telecaller=None):
         """Get performance trend for specified number of days"""
-        df = self.get_all_reports()
-        
-        if df.empty:
-            return []
-        
-        if telecaller:
-            df = df[df['Telecaller'] == telecaller]
-        
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days)
-        
-        df_trend = df[(df['Date'] >= start_date) & (df['Date'] <= end_date)]
-        
-        if df_trend.empty:
-            return []
-        
-        trend_data = df_trend.groupby(df_trend['Date'].dt.date).agg({
-            'Total Calls': 'sum',
-            'New Data': 'sum'
-        }).reset_index()
-        
-        trend_data['date'] = pd.to_datetime(trend_data['Date']).dt.strftime('%Y-%m-%d')
-        trend_data = trend_data.sort_values('Date')
-        
-        return trend_data.to_dict('records')
+        return self._daily_totals(days, telecaller)
     
     def get_telecaller_performance(self):
         """Get performance summary for all telecallers"""
-        df = self.get_all_reports()
+        cube = self.get_daily_cube()
         
-        if df.empty or 'Telecaller' not in df.columns:
+        if cube.empty:
             return pd.DataFrame()
         
-        performance = df.groupby('Telecaller').agg({
-            'Total Calls': 'sum',
-            'New Data': 'sum',
-            'CRM Data': 'sum',
-            'Video': lambda x: (x == 'Yes').sum()
-        }).reset_index()
-        
-        performance.columns = ['Telecaller', 'Total Calls', 'New Data', 'CRM Data', 'Video Activities']
-        performance['Conversion Rate'] = (performance['New Data'] / performance['Total Calls'] * 100).round(1)
+        with span('aggregate'):
+            performance = cube.groupby('Telecaller', observed=True)[['Total Calls', 'New Data', 'CRM Data', 'Video Count']].sum().reset_index()
+            
+            performance.columns = ['Telecaller', 'Total Calls', 'New Data', 'CRM Data', 'Video Activities']
+            performance['Conversion Rate'] = (performance['New Data'] / performance['Total Calls'] * 100).round(1)
         
         return performance
     
     def get_video_activities(self, days=30, telecaller=None):
         """Get video activities"""
-        df = self.get_all_reports()
+        video_df = self.get_video_activity_frame(days, telecaller)
+        return video_df.to_dict('records') if not video_df.empty else []
+    
+    def get_video_activity_frame(self, days=30, telecaller=None):
+        """Get reports with video activity in the last `days` days, newest first"""
+        df = self._get_sorted_reports()
         
         if df.empty:
-            return []
-        
-        if telecaller:
-            df = df[df['Telecaller'] == telecaller]
+            return pd.DataFrame()
         
         end_date = datetime.now()
         start_date = end_date - timedelta(days=days)
         
-        video_df = df[(df['Video'] == 'Yes') & (df['Date'] >= start_date) & (df['Date'] <= end_date)].copy()
+        with span('filter'):
+            dates = df['Date'].values
+            lo = dates.searchsorted(np.datetime64(start_date), 'left')
+            hi = dates.searchsorted(np.datetime64(end_date), 'right')
+            df = df.iloc[lo:hi]
+            
+            if telecaller:
+                df = df[df['Telecaller'] == telecaller]
+            
+            video_df = df[df['Video'] == 'Yes'].iloc[::-1].copy()
         
         if video_df.empty:
-            return []
+            return video_df
         
-        video_df = video_df.sort_values('Date', ascending=False)
         video_df['date'] = video_df['Date'].dt.strftime('%Y-%m-%d')
         
-        return video_df.to_dict('records')
+        return video_df
     
     def get_country_distribution(self, telecaller=None):
         """Get country distribution of leads"""
-        df = self.get_all_reports()
+        df = self._get_sorted_reports()
         
         if df.empty:
             return {}
         
-        if telecaller:
-            df = df[df['Telecaller'] == telecaller]
-        
-        country_data = df[df['Country Data'].notna() & (df['Country Data'] != '')]
-        
-        if country_data.empty:
-            return {}
-        
-        return country_data['Country Data'].value_counts().to_dict()
+        with span('aggregate'):
+            if telecaller:
+                df = df[df['Telecaller'] == telecaller]
+            
+            country_data = df[df['Country Data'].notna() & (df['Country Data'] != '')]
+            
+            if country_data.empty:
+                return {}
+            
+            counts = country_data['Country Data'].value_counts()
+        # Categorical columns also count categories that do not occur here
+        return counts[counts > 0].to_dict()
+    
+    def get_memory_report(self):
+        """Get bytes per row of the loaded report data, compact schema vs legacy layout"""
+        return memory_report(self.gs_service.get_all_reports())
     
     def log_edit_action(self, edit_log):
         """Log edit actions for history tracking"""
         try:
             return self.gs_service.log_edit_action(edit_log)
         except Exception as e:
-            st.error(f"Error logging edit action: {str(e)}")
+            report_error(f"Error logging edit action: {str(e)}")
             return False
     
     def get_edit_logs(self):
@@ -294,7 +504,7 @@ class DataProcessor:
         try:
             return self.gs_service.get_edit_logs()
         except Exception as e:
-            st.error(f"Error fetching edit logs: {str(e)}")
+            report_error(f"Error fetching edit logs: {str(e)}")
             return pd.DataFrame()
     
     def check_connection(self):
@@ -302,4 +512,16 @@ class DataProcessor:
         try:
             return self.gs_service.check_connection()
         except:
-            return {'google_sheets': False, 'worksheets': [], 'local_mode': True}
\ No newline at end of file
+            return {'google_sheets': False, 'worksheets': [], 'local_mode': True}
+
+
+def _day_bounds(dates, start=None, end=None):
+    """Binary-search an inclusive day window in an ascending datetime64 array"""
+    lo = 0
+    hi = len(dates)
+    if start:
+        lo = dates.searchsorted(pd.Timestamp(start).normalize().to_datetime64(), 'left')
+    if end:
+        end_exclusive = pd.Timestamp(end).normalize() + pd.Timedelta(days=1)
+        hi = dates.searchsorted(end_exclusive.to_datetime64(), 'left')
+    return lo, hi
@@ -0,0 +1,37 @@
+# error_sink.py
+import logging
+
+logger = logging.getLogger('telecaller_dashboard')
+
+# Optional UI callbacks (the Streamlit app registers st.error / st.warning);
+# messages are always logged, so servers and functions need no UI at all
+_handlers = {'error': None, 'warning': None}
+
+
+def set_error_handlers(error=None, warning=None):
+    """Register callables that also show errors and warnings to the user"""
+    _handlers['error'] = error
+    _handlers['warning'] = warning
+
+
+def _show(kind, message):
+    handler = _handlers[kind]
+    if handler is None:
+        return
+    try:
+        handler(message)
+    except Exception:
+        # e.g. a UI call made outside the UI's own thread
+        logger.debug(f"Could not show {kind}: {message}")
+
+
+def report_error(message):
+    """Log an error from the data layer and pass it on to the UI, if one is registered"""
+    logger.error(message)
+    _show('error', message)
+
+
+def report_warning(message):
+    """Log a warning from the data layer and pass it on to the UI, if one is registered"""
+    logger.warning(message)
+    _show('warning', message)
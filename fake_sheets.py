@@ -0,0 +1,601 @@
+# fake_sheets.py
+# Offline stand-in for the part of gspread that GoogleSheetsService uses, for
+# load tests and benchmarks that must not touch the real quota. Select it with
+# SHEETS_BACKEND=fake (in process) or SHEETS_BACKEND=http://host:port (a
+# server started with `python fake_sheets.py serve`).
+import argparse
+import json
+import os
+import random
+import threading
+import time
+import types
+import urllib.error
+import urllib.request
+from collections import Counter, deque, namedtuple
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from sheet_utils import a1_to_rowcol
+
+DEFAULT_TITLE = 'Telecaller Daily Reports'
+
+# Simulated network latency per request, in seconds (plus up to JITTER more)
+FAKE_SHEETS_LATENCY = float(os.environ.get('FAKE_SHEETS_LATENCY', 0))
+FAKE_SHEETS_JITTER = float(os.environ.get('FAKE_SHEETS_JITTER', 0))
+
+# Server-side per-minute quotas answered with 429 when exceeded; 0 is unlimited
+FAKE_SHEETS_READS_PER_MINUTE = int(os.environ.get('FAKE_SHEETS_READS_PER_MINUTE', 0))
+FAKE_SHEETS_WRITES_PER_MINUTE = int(os.environ.get('FAKE_SHEETS_WRITES_PER_MINUTE', 0))
+
+# Fraction of requests failing with a transient 503
+FAKE_SHEETS_FAILURE_RATE = float(os.environ.get('FAKE_SHEETS_FAILURE_RATE', 0))
+
+Cell = namedtuple('Cell', ['row', 'col', 'value'])
+
+
+class FakeAPIError(Exception):
+    """Stand-in for gspread's APIError; code is the HTTP status, as the rate limiter expects"""
+
+    def __init__(self, code, message):
+        super().__init__(f"APIError: [{code}]: {message}")
+        self.code = code
+        self.message = message
+
+
+class WorksheetNotFound(Exception):
+    """Raised by worksheet() for a title the spreadsheet does not have"""
+
+
+def _display(value):
+    """Format a stored value the way the Sheets API returns it"""
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'TRUE' if value else 'FALSE'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _numericise(value):
+    """Turn numeric text into a number, like get_all_records does"""
+    for cast in (int, float):
+        try:
+            return cast(value)
+        except ValueError:
+            pass
+    return value
+
+
+class FakeBackend:
+    """Shared state of the fake spreadsheets, with simulated latency, quota and failures.
+
+    Every API-level call on a fake spreadsheet or worksheet is one request:
+    it sleeps for the configured latency, then may fail with an injected
+    error, a 429 when its kind is over the per-minute quota, or a random 503.
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, reads_per_minute=0, writes_per_minute=0,
+                 failure_rate=0.0, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.quotas = {'read': reads_per_minute, 'write': writes_per_minute}
+        self.failure_rate = failure_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.RLock()
+        self._windows = {'read': deque(), 'write': deque()}
+        self._injected = deque()
+        self._spreadsheets = {}
+        self._stats = Counter()
+        self._methods = Counter()
+
+    @classmethod
+    def from_env(cls):
+        return cls(latency=FAKE_SHEETS_LATENCY, jitter=FAKE_SHEETS_JITTER,
+                   reads_per_minute=FAKE_SHEETS_READS_PER_MINUTE,
+                   writes_per_minute=FAKE_SHEETS_WRITES_PER_MINUTE,
+                   failure_rate=FAKE_SHEETS_FAILURE_RATE)
+
+    def fail_next(self, count=1, code=503):
+        """Make the next count requests fail with the given HTTP status"""
+        with self._lock:
+            self._injected.extend([code] * count)
+
+    def request(self, kind, method):
+        """Account for one API request of the given kind ('read' or 'write')"""
+        delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0)
+        if delay:
+            time.sleep(delay)
+        with self._lock:
+            self._stats[f'{kind}s'] += 1
+            self._methods[method] += 1
+            if self._injected:
+                self._stats['failed'] += 1
+                raise FakeAPIError(self._injected.popleft(), 'Injected failure')
+
+            quota = self.quotas[kind]
+            if quota:
+                window = self._windows[kind]
+                now = time.monotonic()
+                while window and window[0] <= now - 60:
+                    window.popleft()
+                if len(window) >= quota:
+                    self._stats['throttled'] += 1
+                    raise FakeAPIError(429, f"Quota exceeded for quota metric '{kind.title()} requests'")
+                window.append(now)
+
+            if self.failure_rate and self._rng.random() < self.failure_rate:
+                self._stats['failed'] += 1
+                raise FakeAPIError(503, 'The service is currently unavailable.')
+
+    def stats(self):
+        """Get request counts: reads, writes, throttled and failed, and calls per method"""
+        with self._lock:
+            return {**{key: self._stats[key] for key in ('reads', 'writes', 'throttled', 'failed')},
+                    'methods': dict(self._methods)}
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats.clear()
+            self._methods.clear()
+
+    def spreadsheet(self, key=None, title=None):
+        """Get a fake spreadsheet by key or title, creating it on first use"""
+        with self._lock:
+            for spreadsheet in self._spreadsheets.values():
+                if spreadsheet.id == key or (key is None and spreadsheet.title == title):
+                    return spreadsheet
+            key = key or f'fake-{len(self._spreadsheets) + 1}'
+            spreadsheet = FakeSpreadsheet(self, key, title or DEFAULT_TITLE)
+            self._spreadsheets[key] = spreadsheet
+            return spreadsheet
+
+
+class FakeClient:
+    """In-process replacement for an authorized gspread client"""
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def open(self, title):
+        self.backend.request('read', 'open')
+        return self.backend.spreadsheet(title=title)
+
+    def open_by_key(self, key):
+        self.backend.request('read', 'open_by_key')
+        return self.backend.spreadsheet(key=key)
+
+
+class FakeSpreadsheet:
+    def __init__(self, backend, key, title):
+        self._backend = backend
+        self.id = key
+        self.title = title
+        self._worksheets = {}
+
+    def worksheet(self, title):
+        self._backend.request('read', 'worksheet')
+        if title not in self._worksheets:
+            raise WorksheetNotFound(title)
+        return self._worksheets[title]
+
+    def worksheets(self):
+        self._backend.request('read', 'worksheets')
+        return list(self._worksheets.values())
+
+    def add_worksheet(self, title, rows, cols):
+        self._backend.request('write', 'add_worksheet')
+        if title in self._worksheets:
+            raise FakeAPIError(400, f'A sheet with the name "{title}" already exists.')
+        self._worksheets[title] = FakeWorksheet(self._backend, title, rows, cols)
+        return self._worksheets[title]
+
+    def del_worksheet(self, worksheet):
+        self._backend.request('write', 'del_worksheet')
+        self._worksheets.pop(worksheet.title, None)
+
+
+class FakeWorksheet:
+    """A worksheet grid with row_count x col_count cells; only the filled rows are stored"""
+
+    def __init__(self, backend, title, rows=1000, cols=26):
+        self._backend = backend
+        self._lock = threading.RLock()
+        self.title = title
+        self.row_count = rows
+        self.col_count = cols
+        self._rows = []
+
+    # Grid helpers; these are not requests
+
+    def _last_filled_row(self):
+        for index in range(len(self._rows) - 1, -1, -1):
+            if any(_display(v) for v in self._rows[index]):
+                return index + 1
+        return 0
+
+    def _set(self, row, col, value):
+        while len(self._rows) < row:
+            self._rows.append([])
+        cells = self._rows[row - 1]
+        while len(cells) < col:
+            cells.append('')
+        cells[col - 1] = value
+
+    def _value(self, row, col):
+        if row > len(self._rows) or col > len(self._rows[row - 1]):
+            return ''
+        return _display(self._rows[row - 1][col - 1])
+
+    def _values(self, first_row=1, first_col=1, last_row=None, last_col=None):
+        """Get displayed values in a block, without trailing empty rows and cells, as the API does"""
+        last_row = min(last_row or len(self._rows), len(self._rows))
+        values = []
+        for cells in self._rows[first_row - 1:last_row]:
+            row = [_display(v) for v in cells[first_col - 1:last_col]]
+            while row and row[-1] == '':
+                row.pop()
+            values.append(row)
+        while values and not values[-1]:
+            values.pop()
+        return values
+
+    def _range(self, range_name):
+        """Parse an A1 range into (first_row, first_col, last_row, last_col); open ends are None"""
+        first, _, last = range_name.split('!')[-1].partition(':')
+        first_row, first_col = a1_to_rowcol(first)
+        last_row, last_col = a1_to_rowcol(last) if last else (first_row, first_col)
+        return first_row or 1, first_col or 1, last_row, last_col
+
+    def _append(self, rows):
+        with self._lock:
+            start = self._last_filled_row() + 1
+            del self._rows[start - 1:]
+            for offset, values in enumerate(rows):
+                for col, value in enumerate(values, start=1):
+                    self._set(start + offset, col, value)
+            self.row_count = max(self.row_count, start + len(rows) - 1)
+            self.col_count = max(self.col_count, max((len(r) for r in rows), default=0))
+
+    # gspread surface
+
+    def get_all_values(self):
+        self._backend.request('read', 'get_all_values')
+        with self._lock:
+            return self._values()
+
+    def get_all_records(self):
+        self._backend.request('read', 'get_all_records')
+        with self._lock:
+            values = self._values()
+        if not values:
+            return []
+        headers = values[0]
+        return [dict(zip(headers, [_numericise(v) if v != '' else '' for v in row] +
+                         [''] * (len(headers) - len(row))))
+                for row in values[1:]]
+
+    def get(self, range_name=None):
+        self._backend.request('read', 'get')
+        with self._lock:
+            if range_name is None:
+                return self._values()
+            return self._values(*self._range(range_name))
+
+    def cell(self, row, col):
+        self._backend.request('read', 'cell')
+        with self._lock:
+            return Cell(row, col, self._value(row, col) or None)
+
+    def find(self, query, in_column=None, in_row=None):
+        self._backend.request('read', 'find')
+        with self._lock:
+            for row_num, cells in enumerate(self._rows, start=1):
+                if in_row is not None and row_num != in_row:
+                    continue
+                for col, value in enumerate(cells, start=1):
+                    if (in_column is None or col == in_column) and _display(value) == query:
+                        return Cell(row_num, col, query)
+        return None
+
+    def append_row(self, values, value_input_option='RAW', **kwargs):
+        self._backend.request('write', 'append_row')
+        self._append([list(values)])
+
+    def append_rows(self, values, value_input_option='RAW', **kwargs):
+        self._backend.request('write', 'append_rows')
+        self._append([list(row) for row in values])
+
+    def update(self, values=None, range_name=None, value_input_option='RAW', **kwargs):
+        self._backend.request('write', 'update')
+        first_row, first_col, _, _ = self._range(range_name or 'A1')
+        with self._lock:
+            last_row = first_row + len(values) - 1
+            last_col = first_col + max((len(r) for r in values), default=1) - 1
+            if last_row > self.row_count or last_col > self.col_count:
+                raise FakeAPIError(400, f'Range ({self.title}!{range_name}) exceeds grid limits. '
+                                        f'Max rows: {self.row_count}, max columns: {self.col_count}')
+            for row_offset, row in enumerate(values):
+                for col_offset, value in enumerate(row):
+                    self._set(first_row + row_offset, first_col + col_offset, value)
+
+    def update_cell(self, row, col, value):
+        self._backend.request('write', 'update_cell')
+        with self._lock:
+            if row > self.row_count or col > self.col_count:
+                raise FakeAPIError(400, f'Cell ({row}, {col}) exceeds grid limits.')
+            self._set(row, col, value)
+
+    def delete_rows(self, start_index, end_index=None):
+        self._backend.request('write', 'delete_rows')
+        end_index = end_index or start_index
+        with self._lock:
+            del self._rows[start_index - 1:end_index]
+            self.row_count -= end_index - start_index + 1
+
+    def add_rows(self, rows):
+        self._backend.request('write', 'add_rows')
+        self.row_count += rows
+
+    def add_cols(self, cols):
+        self._backend.request('write', 'add_cols')
+        self.col_count += cols
+
+    def clear(self):
+        self._backend.request('write', 'clear')
+        with self._lock:
+            self._rows = []
+
+
+def seed_reports(backend, reports_df, title=DEFAULT_TITLE):
+    """Fill a fake spreadsheet's Reports sheet with a canonical report frame (no requests counted)"""
+    from google_sheets_service import REPORT_HEADERS
+
+    spreadsheet = backend.spreadsheet(title=title)
+    worksheet = spreadsheet._worksheets.get('Reports')
+    if worksheet is None:
+        worksheet = spreadsheet._worksheets['Reports'] = FakeWorksheet(backend, 'Reports', 1000, 20)
+    df = reports_df.reindex(columns=REPORT_HEADERS).copy()
+    df['Date'] = df['Date'].dt.strftime('%d/%m/%Y %H:%M:%S')
+    df = df.astype(object).where(df.notna(), '')
+    with worksheet._lock:
+        worksheet._rows = [list(REPORT_HEADERS)] + [list(row) for row in df.itertuples(index=False, name=None)]
+        worksheet.row_count = max(worksheet.row_count, len(worksheet._rows))
+        worksheet.col_count = max(worksheet.col_count, len(REPORT_HEADERS))
+    return worksheet
+
+
+# Shared in-process backend, so every service instance sees the same sheets
+_default_backend = None
+_default_backend_lock = threading.Lock()
+
+
+def default_backend():
+    global _default_backend
+    with _default_backend_lock:
+        if _default_backend is None:
+            _default_backend = FakeBackend.from_env()
+        return _default_backend
+
+
+def connect_fake_client(spec='fake'):
+    """Get a client for SHEETS_BACKEND: 'fake' for the in-process backend, or a fake server URL"""
+    if spec.startswith(('http://', 'https://')):
+        return HTTPFakeClient(spec)
+    return FakeClient(default_backend())
+
+
+# HTTP transport: a fake server in one process, thin proxies in the others
+
+SPREADSHEET_METHODS = {'worksheet', 'worksheets', 'add_worksheet', 'del_worksheet'}
+WORKSHEET_METHODS = {'get_all_values', 'get_all_records', 'get', 'cell', 'find', 'append_row',
+                     'append_rows', 'update', 'update_cell', 'delete_rows', 'add_rows', 'add_cols', 'clear'}
+
+
+def _encode_result(result):
+    if isinstance(result, FakeWorksheet):
+        return {'__worksheet__': result.title, 'size': [result.row_count, result.col_count]}
+    if isinstance(result, Cell):
+        return {'__cell__': list(result)}
+    if isinstance(result, list):
+        return [_encode_result(item) for item in result]
+    return result
+
+
+class _FakeSheetsHandler(BaseHTTPRequestHandler):
+    """JSON RPC over HTTP: POST /call runs one spreadsheet or worksheet method"""
+
+    backend = None
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/stats':
+            return self._reply(200, self.backend.stats())
+        self._reply(404, {'error': {'code': 404, 'message': 'Not found'}})
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        request = json.loads(self.rfile.read(length) or b'{}')
+        if self.path == '/fail':
+            self.backend.fail_next(request.get('count', 1), request.get('code', 503))
+            return self._reply(200, {})
+        if self.path != '/call':
+            return self._reply(404, {'error': {'code': 404, 'message': 'Not found'}})
+        try:
+            self._reply(200, self._call(request))
+        except WorksheetNotFound as e:
+            self._reply(404, {'error': {'code': 404, 'message': str(e), 'worksheet_not_found': True}})
+        except FakeAPIError as e:
+            self._reply(e.code, {'error': {'code': e.code, 'message': e.message}})
+        except Exception as e:
+            self._reply(400, {'error': {'code': 400, 'message': str(e)}})
+
+    def _call(self, request):
+        method, args, kwargs = request['method'], request.get('args', []), request.get('kwargs', {})
+        if request.get('spreadsheet_key') is None:
+            # Client-level: open / open_by_key
+            client = FakeClient(self.backend)
+            if method not in ('open', 'open_by_key'):
+                raise ValueError(f'Unknown method {method}')
+            spreadsheet = getattr(client, method)(*args)
+            return {'key': spreadsheet.id, 'title': spreadsheet.title}
+
+        spreadsheet = self.backend.spreadsheet(key=request['spreadsheet_key'])
+        if request.get('worksheet') is None:
+            if method not in SPREADSHEET_METHODS:
+                raise ValueError(f'Unknown method {method}')
+            if method == 'del_worksheet':
+                args = [spreadsheet._worksheets.get(args[0])]
+            return {'result': _encode_result(getattr(spreadsheet, method)(*args, **kwargs))}
+
+        if method not in WORKSHEET_METHODS:
+            raise ValueError(f'Unknown method {method}')
+        worksheet = spreadsheet._worksheets.get(request['worksheet'])
+        if worksheet is None:
+            raise WorksheetNotFound(request['worksheet'])
+        result = getattr(worksheet, method)(*args, **kwargs)
+        return {'result': _encode_result(result), 'size': [worksheet.row_count, worksheet.col_count]}
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(backend=None, host='127.0.0.1', port=8765):
+    """Create an HTTP server for a fake backend; call serve_forever() on the result"""
+    handler = type('FakeSheetsHandler', (_FakeSheetsHandler,), {'backend': backend or default_backend()})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+class HTTPFakeClient:
+    """gspread-like client for a fake server started with `python fake_sheets.py serve`"""
+
+    def __init__(self, url, timeout=60):
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+
+    def _post(self, path, payload):
+        request = urllib.request.Request(f'{self.url}{path}', data=json.dumps(payload).encode('utf-8'),
+                                         headers={'Content-Type': 'application/json'})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            error = json.loads(e.read() or b'{}').get('error', {})
+            if error.get('worksheet_not_found'):
+                raise WorksheetNotFound(error.get('message'))
+            raise FakeAPIError(error.get('code', e.code), error.get('message', str(e)))
+
+    def call(self, method, *args, spreadsheet_key=None, worksheet=None, **kwargs):
+        return self._post('/call', {'spreadsheet_key': spreadsheet_key, 'worksheet': worksheet,
+                                    'method': method, 'args': list(args), 'kwargs': kwargs})
+
+    def stats(self):
+        with urllib.request.urlopen(f'{self.url}/stats', timeout=self.timeout) as response:
+            return json.loads(response.read())
+
+    def fail_next(self, count=1, code=503):
+        self._post('/fail', {'count': count, 'code': code})
+
+    def open(self, title):
+        reply = self.call('open', title)
+        return _RemoteSpreadsheet(self, reply['key'], reply['title'])
+
+    def open_by_key(self, key):
+        reply = self.call('open_by_key', key)
+        return _RemoteSpreadsheet(self, reply['key'], reply['title'])
+
+
+class _RemoteSpreadsheet:
+    def __init__(self, client, key, title):
+        self._client = client
+        self.id = key
+        self.title = title
+
+    def _decode(self, result):
+        if isinstance(result, dict) and '__worksheet__' in result:
+            return _RemoteWorksheet(self._client, self.id, result['__worksheet__'], *result['size'])
+        if isinstance(result, list):
+            return [self._decode(item) for item in result]
+        return result
+
+    def _call(self, method, *args, **kwargs):
+        reply = self._client.call(method, *args, spreadsheet_key=self.id, **kwargs)
+        return self._decode(reply['result'])
+
+    def worksheet(self, title):
+        return self._call('worksheet', title)
+
+    def worksheets(self):
+        return self._call('worksheets')
+
+    def add_worksheet(self, title, rows, cols):
+        return self._call('add_worksheet', title, rows, cols)
+
+    def del_worksheet(self, worksheet):
+        return self._call('del_worksheet', worksheet.title)
+
+
+class _RemoteWorksheet:
+    """Proxy for a worksheet on a fake server; row_count and col_count follow every reply"""
+
+    def __init__(self, client, spreadsheet_key, title, row_count, col_count):
+        self._client = client
+        self._spreadsheet_key = spreadsheet_key
+        self.title = title
+        self.row_count = row_count
+        self.col_count = col_count
+
+    def _call(self, method, *args, **kwargs):
+        reply = self._client.call(method, *args, spreadsheet_key=self._spreadsheet_key,
+                                  worksheet=self.title, **kwargs)
+        self.row_count, self.col_count = reply['size']
+        result = reply['result']
+        if isinstance(result, dict) and '__cell__' in result:
+            return Cell(*result['__cell__'])
+        return result
+
+    def __getattr__(self, name):
+        if name not in WORKSHEET_METHODS:
+            raise AttributeError(name)
+
+        def method(self, *args, **kwargs):
+            return self._call(name, *args, **kwargs)
+        method.__name__ = name
+        # Bound, like a real worksheet method, so callers can see its name and owner
+        return types.MethodType(method, self)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fake Google Sheets server for offline load testing')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    serve_parser = subparsers.add_parser('serve', help='serve a fake backend over HTTP')
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=8765)
+    serve_parser.add_argument('--reports', type=int, default=0, help='seed this many synthetic reports')
+    serve_parser.add_argument('--telecallers', type=int, default=4)
+    serve_parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    backend = default_backend()
+    if args.reports:
+        from synthetic_data import generate_reports
+        days = -(-args.reports // args.telecallers)
+        reports = generate_reports(telecallers=args.telecallers, days=days, seed=args.seed, absence_rate=0)
+        seed_reports(backend, reports.iloc[:args.reports])
+    server = serve(backend, args.host, args.port)
+    print(f"Fake Sheets backend on http://{args.host}:{args.port} (SHEETS_BACKEND=http://{args.host}:{args.port})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+# fast_json.py
+import datetime
+import json
+
+import numpy as np
+import pandas as pd
+
+# orjson is used when installed; the stdlib encoder is the fallback
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(obj):
+    """Encode the numpy, pandas and date values the JSON encoders don't handle natively"""
+    if isinstance(obj, np.integer):
+        return int(obj)
+    if isinstance(obj, np.floating):
+        return None if np.isnan(obj) else float(obj)
+    if isinstance(obj, np.bool_):
+        return bool(obj)
+    if isinstance(obj, (np.ndarray, pd.Series, pd.Index)):
+        return obj.tolist()
+    if obj is pd.NaT:
+        return None
+    if orjson is not None and isinstance(obj, pd.Timestamp):
+        # orjson rejects Timestamps but encodes plain datetimes natively
+        return obj.to_pydatetime()
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        # Includes pandas Timestamps
+        return obj.isoformat()
+    if isinstance(obj, np.datetime64):
+        return pd.Timestamp(obj).isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps_bytes(obj, sort_keys=False):
+    """Serialize obj to UTF-8 JSON bytes"""
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=_default, option=option)
+    return json.dumps(obj, default=_default, sort_keys=sort_keys, ensure_ascii=False,
+                      separators=(',', ':')).encode('utf-8')
+
+
+def dumps(obj, sort_keys=False):
+    """Serialize obj to a JSON string"""
+    if orjson is not None:
+        return dumps_bytes(obj, sort_keys).decode('utf-8')
+    return json.dumps(obj, default=_default, sort_keys=sort_keys, ensure_ascii=False, separators=(',', ':'))
+
+
+def loads(data):
+    """Parse JSON from a string or bytes"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
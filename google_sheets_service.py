@@ -1,144 +1,549 @@
 # google_sheets_integration.py
-import gspread
-from google.oauth2.service_account import Credentials
 import pandas as pd
 from datetime import datetime
-import streamlit as st
+import functools
 import json
+import os
+import threading
+import time
+import uuid
+from collections import namedtuple
+from pathlib import Path
+from error_sink import report_error, report_warning
+from rate_limiter import SheetsRateLimiter
+from sheets_metrics import sheets_metrics
+from profiling import span
+from sheet_utils import rowcol_to_a1
+from sqlite_mirror import ReportsMirror, values_digest, values_to_frame
+from report_schema import apply_report_schema, concat_reports
+from write_behind import WriteBehindQueue
+
+REPORT_HEADERS = ['Date', 'Telecaller', 'Day', 'Total Calls', 'New Data', 'CRM Data',
+                  'Country Data', 'Fair Data', 'Video', 'Video Details',
+                  'Other Work Description', 'Visited Students', 'Remarks', 'ID']
+
+# Column holding each report's stable ID (N); edits and deletes address reports by it
+REPORT_ID_COL = REPORT_HEADERS.index('ID') + 1
+
+USER_HEADERS = ['username', 'password', 'role', 'name', 'telecaller_name',
+                'permissions', 'created_at', 'updated_at', 'is_active']
+
+# Seconds a fetched Reports snapshot is served before the sheet is read again
+REPORTS_CACHE_TTL = float(os.environ.get('REPORTS_CACHE_TTL', 60))
+
+# Report and edit-log appends go through a background write-behind queue
+WRITE_BEHIND_ENABLED = os.environ.get('SHEETS_WRITE_BEHIND', '1') == '1'
+WRITE_BEHIND_BATCH_SIZE = int(os.environ.get('SHEETS_WRITE_BATCH_SIZE', 20))
+WRITE_BEHIND_FLUSH_SECONDS = float(os.environ.get('SHEETS_WRITE_FLUSH_SECONDS', 2))
+
+# Reports are read through a local SQLite mirror that syncs appended rows
+# incrementally and fully reconciles every REPORTS_MIRROR_RECONCILE_SECONDS
+REPORTS_MIRROR_ENABLED = os.environ.get('REPORTS_MIRROR', '1') == '1'
+REPORTS_MIRROR_RECONCILE_SECONDS = float(os.environ.get('REPORTS_MIRROR_RECONCILE_SECONDS', 600))
+
+# SHEETS_BACKEND=fake (or the URL of a fake_sheets server) swaps the real
+# gspread client for an offline fake, for load tests and benchmarks
+SHEETS_BACKEND = os.environ.get('SHEETS_BACKEND', '')
+
+# Per-user Sheets API quotas; one limiter is shared by every service instance
+# in the process because they all use the same service account
+SHEETS_READS_PER_MINUTE = int(os.environ.get('SHEETS_READS_PER_MINUTE', 60))
+SHEETS_WRITES_PER_MINUTE = int(os.environ.get('SHEETS_WRITES_PER_MINUTE', 60))
+sheets_rate_limiter = SheetsRateLimiter(SHEETS_READS_PER_MINUTE, SHEETS_WRITES_PER_MINUTE)
+
+# A changed Reports sheet read by poll_reports: the parsed frame, the state it
+# was read in (mirror content version, or row count and content hash without
+# the mirror) and the snapshot data_version it was read against
+ReportsPoll = namedtuple('ReportsPoll', ['df', 'state', 'data_version'])
+
+def new_report_id():
+    """Generate a stable ID for a new report row.
+    
+    The letter prefix keeps Sheets and gspread from reading an ID as a
+    number (all digits, or digits around an 'e').
+    """
+    return 'r' + uuid.uuid4().hex[:15]
 
 class GoogleSheetsService:
-    def __init__(self):
-        """Initialize Google Sheets service with credentials"""
+    def __init__(self, cache_ttl=None, client=None):
+        """Initialize Google Sheets service with credentials, or with an already authorized client"""
+        # Snapshot cache for the Reports sheet; data_version changes whenever
+        # the cached data is replaced or invalidated
+        self.cache_ttl = REPORTS_CACHE_TTL if cache_ttl is None else cache_ttl
+        self.data_version = 0
+        # reports_epoch only changes when cached rows may have been edited,
+        # removed or reordered; local appends keep the same epoch
+        self.reports_epoch = 0
+        self._reports_df = None
+        self._reports_loaded_at = 0.0
+        self._reports_lock = threading.RLock()
+        # Set while a background refresher keeps the snapshot current; reads
+        # then never go to the sheet on TTL expiry
+        self.background_refresh = False
+        # (row count, content hash) of the Reports sheet at the last poll
+        self._polled_reports = None
+        # Sheet row of each report ID; shifted locally on deletes and checked
+        # against the ID cell before every edit or delete
+        self._report_rows = {}
+        # Sheet row of each user and the number of rows last written to the
+        # Users sheet (header included), so single-user saves can be diffs
+        self._user_rows = {}
+        self._users_row_count = None
+        self._write_queue = None
+        self._mirror = None
+        self.client = client
         self.connect_to_sheets()
     
     def connect_to_sheets(self):
         """Connect to Google Sheets using credentials"""
         try:
-            # Try to get credentials from Streamlit secrets
-            if 'google_sheets' in st.secrets:
-                credentials_dict = st.secrets["google_sheets"]
-                scopes = [
-                    'https://www.googleapis.com/auth/spreadsheets',
-                    'https://www.googleapis.com/auth/drive'
-                ]
-                creds = Credentials.from_service_account_info(credentials_dict, scopes=scopes)
-                self.client = gspread.authorize(creds)
-                
+            credentials_dict = {}
+            if self.client is None and SHEETS_BACKEND:
+                from fake_sheets import connect_fake_client
+                self.client = connect_fake_client(SHEETS_BACKEND)
+            elif self.client is None:
+                credentials_dict = self._load_credentials()
+                if credentials_dict:
+                    # The Google client libraries are only loaded once they are needed
+                    import gspread
+                    from google.oauth2.service_account import Credentials
+                    
+                    scopes = [
+                        'https://www.googleapis.com/auth/spreadsheets',
+                        'https://www.googleapis.com/auth/drive'
+                    ]
+                    creds = Credentials.from_service_account_info(credentials_dict, scopes=scopes)
+                    self.client = gspread.authorize(creds)
+            
+            if self.client is not None:
                 # Open the spreadsheet
-                if 'spreadsheet_id' in st.secrets["google_sheets"]:
-                    self.spreadsheet_id = st.secrets["google_sheets"]["spreadsheet_id"]
-                    self.spreadsheet = self.client.open_by_key(self.spreadsheet_id)
+                spreadsheet_id = self._spreadsheet_id(credentials_dict)
+                if spreadsheet_id:
+                    self.spreadsheet_id = spreadsheet_id
+                    self.spreadsheet = self._call('read', self.client.open_by_key, self.spreadsheet_id)
                 else:
-                    self.spreadsheet = self.client.open("Telecaller Daily Reports")
+                    self.spreadsheet = self._call('read', self.client.open, "Telecaller Daily Reports")
                 
                 # Initialize worksheets
                 self.init_worksheets()
+                self._start_write_queue()
+                self._open_mirror()
             else:
-                st.error("Google Sheets credentials not found in secrets")
+                report_error("Google Sheets credentials not found in GOOGLE_CREDENTIALS_JSON or secrets")
                 self.client = None
                 self.spreadsheet = None
         except Exception as e:
-            st.error(f"Error connecting to Google Sheets: {str(e)}")
+            report_error(f"Error connecting to Google Sheets: {str(e)}")
             self.client = None
             self.spreadsheet = None
     
+    def _load_credentials(self):
+        """Get the service account info from GOOGLE_CREDENTIALS_JSON, or from Streamlit secrets"""
+        credentials_json = os.environ.get('GOOGLE_CREDENTIALS_JSON')
+        if credentials_json:
+            return json.loads(credentials_json)
+        return self._secrets_section()
+    
+    def _spreadsheet_id(self, credentials_dict):
+        """Get the configured spreadsheet ID: SPREADSHEET_ID, then the credentials, then Streamlit secrets"""
+        spreadsheet_id = os.environ.get('SPREADSHEET_ID') or credentials_dict.get('spreadsheet_id')
+        if spreadsheet_id or not credentials_dict:
+            # No credentials means an injected or fake client, which secrets don't describe
+            return spreadsheet_id
+        # Credentials from the env var don't replace a spreadsheet_id kept in secrets
+        secrets = self._secrets_section() or {}
+        return secrets.get('spreadsheet_id')
+    
+    def _secrets_section(self):
+        """Get the google_sheets section of Streamlit secrets, if there is one"""
+        try:
+            # Streamlit is only imported when the settings above don't cover it
+            import streamlit as st
+            if 'google_sheets' in st.secrets:
+                return dict(st.secrets["google_sheets"])
+        except Exception:
+            pass
+        return None
+    
     def init_worksheets(self):
         """Initialize all required worksheets"""
         try:
             # Reports worksheet
             try:
-                self.reports_ws = self.spreadsheet.worksheet("Reports")
+                self.reports_ws = self._call('read', self.spreadsheet.worksheet, "Reports")
             except:
-                self.reports_ws = self.spreadsheet.add_worksheet("Reports", 1000, 20)
+                self.reports_ws = self._call('write', self.spreadsheet.add_worksheet, "Reports", 1000, 20)
                 # Add headers
-                headers = ['Date', 'Telecaller', 'Day', 'Total Calls', 'New Data', 'CRM Data',
-                          'Country Data', 'Fair Data', 'Video', 'Video Details', 
-                          'Other Work Description', 'Visited Students', 'Remarks']
-                self.reports_ws.append_row(headers)
+                self._call('write', self.reports_ws.append_row, REPORT_HEADERS)
             
             # Edit History worksheet
             try:
-                self.edit_history_ws = self.spreadsheet.worksheet("EditHistory")
+                self.edit_history_ws = self._call('read', self.spreadsheet.worksheet, "EditHistory")
             except:
-                self.edit_history_ws = self.spreadsheet.add_worksheet("EditHistory", 1000, 10)
+                self.edit_history_ws = self._call('write', self.spreadsheet.add_worksheet, "EditHistory", 1000, 10)
                 # Add headers
                 headers = ['timestamp', 'user', 'username', 'role', 'action', 'report_date',
                           'telecaller', 'original_data', 'new_data']
-                self.edit_history_ws.append_row(headers)
+                self._call('write', self.edit_history_ws.append_row, headers)
             
             # Users worksheet
             try:
-                self.users_ws = self.spreadsheet.worksheet("Users")
+                self.users_ws = self._call('read', self.spreadsheet.worksheet, "Users")
             except:
-                self.users_ws = self.spreadsheet.add_worksheet("Users", 100, 15)
+                self.users_ws = self._call('write', self.spreadsheet.add_worksheet, "Users", 100, 15)
                 # Add headers
-                headers = ['username', 'password', 'role', 'name', 'telecaller_name',
-                          'permissions', 'created_at', 'updated_at', 'is_active']
-                self.users_ws.append_row(headers)
+                self._call('write', self.users_ws.append_row, USER_HEADERS)
                 
         except Exception as e:
-            st.error(f"Error initializing worksheets: {str(e)}")
+            report_error(f"Error initializing worksheets: {str(e)}")
+    
+    def _call(self, kind, fn, *args, background=False, **kwargs):
+        """Make a Sheets API call through the shared rate limiter, recording every attempt in sheets_metrics"""
+        measured = sheets_metrics.measured(fn)
+        return sheets_rate_limiter.call(kind, measured, *args, background=background, **kwargs)
+    
+    def _start_write_queue(self):
+        """Start the write-behind queue for report and edit-log appends"""
+        if not WRITE_BEHIND_ENABLED:
+            return
+        data_dir = Path(os.environ.get('DATA_DIR', 'data'))
+        self._write_queue = WriteBehindQueue(
+            self._append_rows_to,
+            journal_path=data_dir / 'pending_sheet_writes.jsonl',
+            max_batch=WRITE_BEHIND_BATCH_SIZE,
+            flush_interval=WRITE_BEHIND_FLUSH_SECONDS
+        )
+    
+    def _open_mirror(self):
+        """Open the local SQLite mirror of the Reports sheet"""
+        if not REPORTS_MIRROR_ENABLED:
+            return
+        data_dir = Path(os.environ.get('DATA_DIR', 'data'))
+        self._mirror = ReportsMirror(data_dir / 'reports_mirror.db',
+                                     reconcile_interval=REPORTS_MIRROR_RECONCILE_SECONDS)
+    
+    def _append_rows_to(self, worksheet_name, rows, background=True):
+        """Append a batch of queued rows to the named worksheet"""
+        worksheets = {'Reports': self.reports_ws, 'EditHistory': self.edit_history_ws}
+        # Queued batches are attributed to the queue even when a request flushes them
+        token = sheets_metrics.begin_scope('write-behind') if background else None
+        try:
+            self._call('write', worksheets[worksheet_name].append_rows, rows, background=background)
+        finally:
+            if token is not None:
+                sheets_metrics.end_scope(token)
+    
+    def _queue_append(self, worksheet_name, row):
+        """Append a row through the write-behind queue, or directly if it is disabled"""
+        if self._write_queue is not None:
+            self._write_queue.put(worksheet_name, row)
+        else:
+            self._append_rows_to(worksheet_name, [row], background=False)
+    
+    def flush_pending_writes(self):
+        """Write any queued rows to the sheet now"""
+        if self._write_queue is None:
+            return True
+        return self._write_queue.flush()
+    
+    def close(self):
+        """Write queued rows and release the write-behind journal; later appends go straight to the sheet"""
+        if self._write_queue is not None:
+            self._write_queue.close()
+            self._write_queue = None
     
     def get_sheet_names(self):
         """Get all worksheet names"""
         try:
             if self.spreadsheet:
-                return [ws.title for ws in self.spreadsheet.worksheets()]
+                return [ws.title for ws in self._call('read', self.spreadsheet.worksheets)]
             return []
         except Exception as e:
-            st.error(f"Error getting sheet names: {str(e)}")
+            report_error(f"Error getting sheet names: {str(e)}")
             return []
     
-    def get_all_reports(self):
-        """Get all reports from Google Sheets"""
-        try:
-            if not self.spreadsheet:
+    def get_all_reports(self, force_refresh=False):
+        """Get all reports, served from the snapshot cache while it is fresh"""
+        with self._reports_lock:
+            if force_refresh or self._reports_cache_expired():
+                self._refresh_reports()
+            if self._reports_df is None:
                 return pd.DataFrame()
-            
-            records = self.reports_ws.get_all_records()
-            if records:
-                df = pd.DataFrame(records)
-                
-                # Parse date
-                if 'Date' in df.columns:
-                    df['Date'] = pd.to_datetime(df['Date'], format='%d/%m/%Y %H:%M:%S', errors='coerce')
-                
-                # Convert numeric columns
-                numeric_cols = ['Total Calls', 'New Data', 'CRM Data', 'Fair Data', 'Visited Students']
-                for col in numeric_cols:
-                    if col in df.columns:
-                        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(int)
-                
-                return df
-            return pd.DataFrame()
+            return self._reports_df.copy()
+    
+    def get_reports_version(self):
+        """Get the data version of the Reports snapshot, refreshing it if stale"""
+        with self._reports_lock:
+            if self._reports_cache_expired():
+                self._refresh_reports()
+            return self.data_version
+    
+    def seed_reports(self, df):
+        """Install a previously saved Reports frame as the current snapshot"""
+        self.publish_reports(apply_report_schema(df))
+    
+    def publish_reports(self, df, on_publish=None, poll=None):
+        """Install a parsed Reports frame as the current snapshot; returns whether it was installed.
+        
+        on_publish(data_version) is called under the snapshot lock, so caches
+        derived from df can be swapped in together with it. A frame from a
+        poll is dropped if local writes changed the snapshot after the sheet
+        was read, since it may not contain them.
+        """
+        with self._reports_lock:
+            if poll is not None:
+                if self.data_version != poll.data_version:
+                    return False
+                self._polled_reports = poll.state
+            self._reports_df = df
+            self._reports_loaded_at = time.monotonic()
+            self.data_version += 1
+            self.reports_epoch += 1
+            self._index_report_ids()
+            if on_publish is not None:
+                on_publish(self.data_version)
+            return True
+    
+    def poll_reports(self):
+        """Read the Reports sheet and return a ReportsPoll if it changed since the last publish, else None.
+        
+        With the mirror, a poll is its incremental sync: only rows below the
+        last mirrored one are read, and the whole sheet is read and hashed on
+        reconcile. Without it, each poll reads the whole sheet and compares its
+        row count and content hash. An unchanged sheet is never parsed. Runs
+        off the request path and does not take the snapshot lock while
+        reading; publish_reports checks the result against writes made
+        meanwhile.
+        """
+        if not self.spreadsheet:
+            return None
+        read_at_version = self.data_version
+        # Queued reports must reach the sheet before it is re-read
+        if self._write_queue is not None and self._write_queue.pending_count('Reports'):
+            self._write_queue.flush()
+        
+        values = None
+        if self._mirror is not None:
+            background_call = functools.partial(self._call, background=True)
+            polled = self._mirror.sync(self.reports_ws, background_call, self._parse_reports)
+        else:
+            values = self._call('read', self.reports_ws.get_all_values, background=True)
+            polled = (len(values), values_digest(values))
+        if polled == self._polled_reports and self._reports_df is not None:
+            with self._reports_lock:
+                self._reports_loaded_at = time.monotonic()
+            return None
+        
+        if values is None:
+            df = self._mirror.load_reports()
+        elif values:
+            df = values_to_frame(values[0], values[1:], self._parse_reports)
+        else:
+            df = pd.DataFrame()
+        return ReportsPoll(self._ensure_report_ids(df), polled, read_at_version)
+    
+    def _refresh_reports(self):
+        """Replace the cached Reports snapshot with a fresh read"""
+        if not self.spreadsheet and self._reports_df is not None:
+            # Offline with a seeded snapshot: keep serving it
+            self._reports_loaded_at = time.monotonic()
+            return
+        try:
+            # Queued reports must reach the sheet before it is re-read
+            if self._write_queue is not None and self._write_queue.pending_count('Reports'):
+                self._write_queue.flush()
+
+            self._reports_df = self._ensure_report_ids(self._fetch_reports())
+            self._reports_loaded_at = time.monotonic()
+            self.data_version += 1
+            self.reports_epoch += 1
+            self._index_report_ids()
+        except Exception as e:
+            # Keep serving the last good snapshot if there is one
+            report_error(f"Error fetching reports: {str(e)}")
+    
+    def _reports_cache_expired(self):
+        """Check whether the cached Reports snapshot must be re-read"""
+        if self._reports_df is None:
+            return True
+        if self.background_refresh:
+            return False
+        if self.cache_ttl is None or self.cache_ttl < 0:
+            return False
+        return time.monotonic() - self._reports_loaded_at >= self.cache_ttl
+    
+    def invalidate_reports_cache(self):
+        """Drop the cached Reports snapshot so the next read hits the sheet"""
+        with self._reports_lock:
+            self._reports_df = None
+            self._reports_loaded_at = 0.0
+            self.data_version += 1
+            self.reports_epoch += 1
+    
+    def _append_to_snapshot(self, row):
+        """Append a newly written report row to the cached snapshot"""
+        with self._reports_lock:
+            if self._reports_df is None:
+                return
+            headers = list(self._reports_df.columns) or REPORT_HEADERS
+            record = dict(zip(REPORT_HEADERS, row))
+            new_df = self._parse_reports([{col: record.get(col, '') for col in headers}])
+            self._reports_df = concat_reports([self._reports_df, new_df])
+            self.data_version += 1
+            if record.get('ID'):
+                # Queued appends land in order, right after the rows already cached
+                self._report_rows[record['ID']] = len(self._reports_df) + 1
+    
+    def _replace_in_snapshot(self, index, updated):
+        """Overwrite one report row of the cached snapshot with a parsed edited row"""
+        with self._reports_lock:
+            if self._reports_df is None or index not in self._reports_df.index:
+                return
+            df = self._reports_df.copy()
+            for col in updated.columns:
+                if col in df.columns:
+                    value = updated.at[0, col]
+                    if isinstance(df[col].dtype, pd.CategoricalDtype) and value not in df[col].cat.categories:
+                        df[col] = df[col].cat.add_categories([value])
+                    df.at[index, col] = value
+            self._reports_df = df
+            self.data_version += 1
+            self.reports_epoch += 1
+    
+    def _remove_from_snapshot(self, index):
+        """Drop one deleted report row from the cached snapshot, renumbering the rows below it"""
+        with self._reports_lock:
+            if self._reports_df is None or index not in self._reports_df.index:
+                return
+            self._reports_df = self._reports_df.drop(index).reset_index(drop=True)
+            self.data_version += 1
+            self.reports_epoch += 1
+    
+    def _index_report_ids(self):
+        """Rebuild the ID -> sheet row map from the cached snapshot"""
+        df = self._reports_df
+        if df is None or df.empty or 'ID' not in df.columns:
+            self._report_rows = {}
+            return
+        self._report_rows = {report_id: int(label) + 2 for label, report_id in zip(df.index, df['ID'])
+                             if report_id}
+    
+    def _ensure_report_ids(self, df):
+        """Give every report an ID, writing the missing ones back to the sheet in one request"""
+        if df.empty:
+            return df
+        if 'ID' in df.columns:
+            ids = df['ID'].astype(object).fillna('').astype(str)
+        else:
+            ids = pd.Series('', index=df.index, dtype=object)
+        missing = ids == ''
+        if not missing.any():
+            return df
+        
+        ids[missing] = [new_report_id() for _ in range(int(missing.sum()))]
+        try:
+            if self.reports_ws.col_count < REPORT_ID_COL:
+                self._call('write', self.reports_ws.add_cols, REPORT_ID_COL - self.reports_ws.col_count)
+            # Header and the whole ID column in a single ranged update
+            values = [['ID']] + [[report_id] for report_id in ids]
+            id_range = f"{rowcol_to_a1(1, REPORT_ID_COL)}:{rowcol_to_a1(len(values), REPORT_ID_COL)}"
+            self._call('write', self.reports_ws.update, values=values, range_name=id_range)
         except Exception as e:
-            st.error(f"Error fetching reports: {str(e)}")
+            report_warning(f"Could not assign IDs to existing reports: {str(e)}")
+            return df
+        
+        if self._mirror is not None:
+            self._mirror.mark_dirty()
+        df = df.copy()
+        df['ID'] = ids.values
+        return df
+    
+    def _locate_report(self, report_key):
+        """Find a report's sheet row by ID, confirming it against the ID cell in the sheet.
+        
+        Returns (row_num, report_id, moved); row_num is None if the report is
+        gone. moved means the row was not where the snapshot put it, because
+        rows were added, removed or reordered by someone else. An int key is a
+        legacy positional index into the snapshot.
+        """
+        if isinstance(report_key, str):
+            report_id = report_key
+        else:
+            index = int(report_key)
+            if index < 0 or index >= self._cached_report_count():
+                return None, None, False
+            report_id = self._snapshot_report_id(index)
+            if not report_id:
+                return index + 2, None, False
+        
+        row_num = self._report_rows.get(report_id)
+        if row_num is not None:
+            cell = self._call('read', self.reports_ws.cell, row_num, REPORT_ID_COL)
+            if cell.value == report_id:
+                return row_num, report_id, False
+        
+        cell = self._call('read', self.reports_ws.find, report_id, in_column=REPORT_ID_COL)
+        if cell is None:
+            return None, report_id, False
+        return cell.row, report_id, True
+    
+    def _snapshot_report_id(self, index):
+        """Get the ID of the cached report at a positional index, if it has one"""
+        with self._reports_lock:
+            df = self._reports_df
+            if df is None or 'ID' not in df.columns or index not in df.index:
+                return None
+            return df.at[index, 'ID'] or None
+    
+    def _expire_reports_cache(self):
+        """Re-read Reports, and fully reconcile the mirror, after rows moved under us"""
+        if self._mirror is not None:
+            self._mirror.mark_dirty()
+        self.invalidate_reports_cache()
+    
+    def _fetch_reports(self):
+        """Read and parse the whole Reports sheet"""
+        if not self.spreadsheet:
             return pd.DataFrame()
+        
+        if self._mirror is not None:
+            try:
+                with span('sheets'):
+                    self._mirror.sync(self.reports_ws, self._call, self._parse_reports)
+            except Exception as e:
+                # Slow or rate-limited Sheets: keep serving the last mirrored copy
+                report_warning(f"Could not sync reports from Google Sheets, using local copy: {str(e)}")
+            with span('parse'):
+                return self._mirror.load_reports()
+        
+        # Raw values, not get_all_records: it numericises cells, mangling
+        # numeric-looking IDs that older versions generated
+        with span('sheets'):
+            values = self._call('read', self.reports_ws.get_all_values)
+        with span('parse'):
+            if not values:
+                return pd.DataFrame()
+            return values_to_frame(values[0], values[1:], self._parse_reports)
+    
+    def _parse_reports(self, records):
+        """Parse Reports sheet records into a DataFrame"""
+        if records:
+            # Dates, counts, categories and text are typed once here, at load time
+            return apply_report_schema(pd.DataFrame(records), date_format='%d/%m/%Y %H:%M:%S')
+        return pd.DataFrame()
     
     def add_report(self, report_data):
-        """Add a new report to Google Sheets"""
+        """Add a new report to Google Sheets; returns the new report's ID, or False on failure"""
         try:
             if not self.spreadsheet:
                 return False
             
             # Prepare row data
-            row = [
-                report_data.get('date', ''),
-                report_data.get('telecaller', ''),
-                report_data.get('day', ''),
-                report_data.get('total_calls', 0),
-                report_data.get('new_data', 0),
-                report_data.get('crm_data', 0),
-                report_data.get('country_data', ''),
-                report_data.get('fair_data', 0),
-                report_data.get('video', 'No'),
-                report_data.get('video_details', ''),
-                report_data.get('other_work', ''),
-                report_data.get('visited_students', 0),
-                report_data.get('remarks', '')
-            ]
+            report_id = new_report_id()
+            row = self._report_row(report_data, report_id)
             
-            self.reports_ws.append_row(row)
+            self._queue_append('Reports', row)
+            self._append_to_snapshot(row)
             
             # Log the add action
             edit_log = {
@@ -154,63 +559,105 @@ class GoogleSheetsService:
             }
             self.log_edit_action(edit_log)
             
-            return True
+            return report_id
         except Exception as e:
-            st.error(f"Error adding report: {str(e)}")
+            report_error(f"Error adding report: {str(e)}")
             return False
     
-    def update_report(self, index, report_data):
-        """Update an existing report"""
+    def update_report(self, report_id, report_data):
+        """Update an existing report, addressed by its ID"""
         try:
             if not self.spreadsheet:
                 return False
             
-            # Get all records to find the row number
-            records = self.reports_ws.get_all_records()
-            if index >= len(records):
-                return False
-            
-            # Row number in sheet (add 2 for header row and 1-indexing)
-            row_num = index + 2
-            
-            # Prepare updated row
-            updated_row = [
-                report_data.get('date', ''),
-                report_data.get('telecaller', ''),
-                report_data.get('day', ''),
-                report_data.get('total_calls', 0),
-                report_data.get('new_data', 0),
-                report_data.get('crm_data', 0),
-                report_data.get('country_data', ''),
-                report_data.get('fair_data', 0),
-                report_data.get('video', 'No'),
-                report_data.get('video_details', ''),
-                report_data.get('other_work', ''),
-                report_data.get('visited_students', 0),
-                report_data.get('remarks', '')
-            ]
-            
-            # Update each cell
-            for col_num, value in enumerate(updated_row, start=1):
-                self.reports_ws.update_cell(row_num, col_num, value)
+            # Rows are only where we expect them once queued appends have landed
+            self.flush_pending_writes()
             
+            # Locate, write and patch the snapshot as one step for this process
+            with self._reports_lock:
+                row_num, report_id, moved = self._locate_report(report_id)
+                if row_num is None:
+                    return False
+                
+                # Prepare updated row, keeping the report's ID
+                updated_row = self._report_row(report_data, report_id)
+                
+                # Write the row in a single ranged request, up to but not including
+                # the ID cell: _locate_report just confirmed it, and USER_ENTERED
+                # would turn an all-digit ID into a number that no longer matches
+                values = updated_row[:REPORT_ID_COL - 1]
+                row_range = f"{rowcol_to_a1(row_num, 1)}:{rowcol_to_a1(row_num, len(values))}"
+                self._call('write', self.reports_ws.update, values=[values], range_name=row_range,
+                           value_input_option='USER_ENTERED')
+                
+                if moved:
+                    self._expire_reports_cache()
+                    return True
+                
+                updated = self._parse_reports([dict(zip(REPORT_HEADERS, updated_row))])
+                self._replace_in_snapshot(row_num - 2, updated)
+                if self._mirror is not None:
+                    self._mirror.replace_row(row_num - 1, updated)
             return True
         except Exception as e:
-            st.error(f"Error updating report: {str(e)}")
+            report_error(f"Error updating report: {str(e)}")
             return False
     
-    def delete_report(self, index):
-        """Delete a report"""
+    def _report_row(self, report_data, report_id=None):
+        """Build a Reports sheet row from report form data"""
+        return [
+            report_data.get('date', ''),
+            report_data.get('telecaller', ''),
+            report_data.get('day', ''),
+            report_data.get('total_calls', 0),
+            report_data.get('new_data', 0),
+            report_data.get('crm_data', 0),
+            report_data.get('country_data', ''),
+            report_data.get('fair_data', 0),
+            report_data.get('video', 'No'),
+            report_data.get('video_details', ''),
+            report_data.get('other_work', ''),
+            report_data.get('visited_students', 0),
+            report_data.get('remarks', ''),
+            report_id or ''
+        ]
+    
+    def _cached_report_count(self):
+        """Get the number of report rows, loading the snapshot only if needed"""
+        with self._reports_lock:
+            if self._reports_df is None:
+                self._refresh_reports()
+            return len(self._reports_df) if self._reports_df is not None else 0
+    
+    def delete_report(self, report_id):
+        """Delete a report, addressed by its ID"""
         try:
             if not self.spreadsheet:
                 return False
             
-            # Row number in sheet (add 2 for header row and 1-indexing)
-            row_num = index + 2
-            self.reports_ws.delete_rows(row_num)
+            # Rows are only where we expect them once queued appends have landed
+            self.flush_pending_writes()
+            
+            with self._reports_lock:
+                row_num, report_id, moved = self._locate_report(report_id)
+                if row_num is None:
+                    return False
+                
+                self._call('write', self.reports_ws.delete_rows, row_num)
+                
+                # Every report below the deleted one moves up a row
+                self._report_rows = {rid: (row - 1 if row > row_num else row)
+                                     for rid, row in self._report_rows.items() if rid != report_id}
+                if moved:
+                    self._expire_reports_cache()
+                    return True
+                
+                self._remove_from_snapshot(row_num - 2)
+                if self._mirror is not None:
+                    self._mirror.delete_row(row_num - 1)
             return True
         except Exception as e:
-            st.error(f"Error deleting report: {str(e)}")
+            report_error(f"Error deleting report: {str(e)}")
             return False
     
     def log_edit_action(self, edit_log):
@@ -231,10 +678,10 @@ class GoogleSheetsService:
                 str(edit_log.get('new_data', ''))
             ]
             
-            self.edit_history_ws.append_row(row)
+            self._queue_append('EditHistory', row)
             return True
         except Exception as e:
-            st.error(f"Error logging edit action: {str(e)}")
+            report_error(f"Error logging edit action: {str(e)}")
             return False
     
     def get_edit_logs(self):
@@ -243,7 +690,8 @@ class GoogleSheetsService:
             if not self.spreadsheet:
                 return pd.DataFrame()
             
-            records = self.edit_history_ws.get_all_records()
+            self.flush_pending_writes()
+            records = self._call('read', self.edit_history_ws.get_all_records)
             if records:
                 df = pd.DataFrame(records)
                 
@@ -254,7 +702,7 @@ class GoogleSheetsService:
                 return df.sort_values('timestamp', ascending=False)
             return pd.DataFrame()
         except Exception as e:
-            st.error(f"Error fetching edit logs: {str(e)}")
+            report_error(f"Error fetching edit logs: {str(e)}")
             return pd.DataFrame()
     
     def get_users(self):
@@ -263,12 +711,16 @@ class GoogleSheetsService:
             if not self.spreadsheet:
                 return {}
             
-            records = self.users_ws.get_all_records()
+            records = self._call('read', self.users_ws.get_all_records)
+            self._user_rows = {}
+            self._users_row_count = len(records) + 1
             if records:
                 users = {}
-                for record in records:
+                for row_num, record in enumerate(records, start=2):
                     username = record.get('username', '')
                     if username:
+                        self._user_rows[username] = row_num
+
                         # Parse permissions JSON
                         permissions = {}
                         if record.get('permissions'):
@@ -290,7 +742,7 @@ class GoogleSheetsService:
                 return users
             return {}
         except Exception as e:
-            st.error(f"Error fetching users: {str(e)}")
+            report_error(f"Error fetching users: {str(e)}")
             return {}
     
     def save_users(self, users):
@@ -299,30 +751,85 @@ class GoogleSheetsService:
             if not self.spreadsheet:
                 return False
             
-            # Clear existing data
-            self.users_ws.clear()
+            rows = [USER_HEADERS]
+            for username, user_data in users.items():
+                rows.append(self._user_row(username, user_data))
             
-            # Add headers
-            headers = ['username', 'password', 'role', 'name', 'telecaller_name',
-                      'permissions', 'created_at', 'updated_at', 'is_active']
-            self.users_ws.append_row(headers)
+            # Blank out rows left over from a longer user list in the same request;
+            # the sheet is measured rather than trusting the cached count, since
+            # another process may have added users since we last read it
+            previous_count = len(self._call('read', self.users_ws.get, 'A:A'))
+            written_count = len(rows)
+            rows += [[''] * len(USER_HEADERS) for _ in range(previous_count - written_count)]
             
-            # Add user data
-            for username, user_data in users.items():
-                row = [
-                    username,
-                    user_data.get('password', ''),
-                    user_data.get('role', ''),
-                    user_data.get('name', ''),
-                    user_data.get('telecaller_name', ''),
-                    json.dumps(user_data.get('permissions', {})),
-                    user_data.get('created_at', ''),
-                    user_data.get('updated_at', ''),
-                    'TRUE' if user_data.get('is_active', True) else 'FALSE'
-                ]
-                self.users_ws.append_row(row)
+            if len(rows) > self.users_ws.row_count:
+                self._call('write', self.users_ws.add_rows, len(rows) - self.users_ws.row_count)
             
+            # Header and all users in a single request, so the sheet is never empty
+            self._call('write', self.users_ws.update, values=rows, range_name='A1')
+            
+            self._user_rows = {username: row_num for row_num, username in enumerate(users, start=2)}
+            self._users_row_count = written_count
             return True
         except Exception as e:
-            st.error(f"Error saving users: {str(e)}")
-            return False
\ No newline at end of file
+            report_error(f"Error saving users: {str(e)}")
+            return False
+    
+    def save_user(self, username, user_data):
+        """Save a single user, rewriting only that user's row"""
+        try:
+            if not self.spreadsheet:
+                return False
+            
+            if self._users_row_count is None:
+                self.get_users()
+            
+            row = self._user_row(username, user_data)
+            row_num = self._locate_user(username)
+            if row_num is None:
+                self._call('write', self.users_ws.append_row, row)
+                if self._users_row_count is not None:
+                    self._users_row_count += 1
+                    self._user_rows[username] = self._users_row_count
+            else:
+                row_range = f"{rowcol_to_a1(row_num, 1)}:{rowcol_to_a1(row_num, len(row))}"
+                self._call('write', self.users_ws.update, values=[row], range_name=row_range)
+            
+            return True
+        except Exception as e:
+            report_error(f"Error saving user: {str(e)}")
+            return False
+    
+    def _locate_user(self, username):
+        """Find a user's sheet row, confirming it against the username cell; None if the user has no row"""
+        row_num = self._user_rows.get(username)
+        if row_num is not None:
+            cell = self._call('read', self.users_ws.cell, row_num, 1)
+            if cell.value == username:
+                return row_num
+            # The Users sheet was rewritten (save_users here or in another
+            # process), so none of the cached rows can be trusted
+            self._user_rows = {}
+            self._users_row_count = None
+        
+        # Also catches a user another process added since we read the sheet
+        cell = self._call('read', self.users_ws.find, username, in_column=1)
+        if cell is None:
+            return None
+        self._user_rows[username] = cell.row
+        return cell.row
+    
+    def _user_row(self, username, user_data):
+        """Build a Users sheet row from user data"""
+        return [
+            username,
+            user_data.get('password', ''),
+            user_data.get('role', ''),
+            user_data.get('name', ''),
+            # None would be skipped by a values update rather than clearing the cell
+            user_data.get('telecaller_name') or '',
+            json.dumps(user_data.get('permissions', {})),
+            user_data.get('created_at', ''),
+            user_data.get('updated_at', ''),
+            'TRUE' if user_data.get('is_active', True) else 'FALSE'
+        ]
@@ -0,0 +1,17 @@
+# mock_processor.py
+import os
+
+from synthetic_data import SyntheticProcessor
+
+# Size of the generated sample data; raise these to load test the API without a sheet
+MOCK_TELECALLERS = int(os.environ.get('MOCK_TELECALLERS', 4))
+MOCK_DAYS = int(os.environ.get('MOCK_DAYS', 90))
+MOCK_SEED = int(os.environ.get('MOCK_SEED', 42))
+
+
+# Mock processor used when Google Sheets access is unavailable
+class MockProcessor(SyntheticProcessor):
+    def __init__(self, telecallers=None, days=None, seed=None):
+        super().__init__(telecallers=telecallers or MOCK_TELECALLERS,
+                         days=days or MOCK_DAYS,
+                         seed=MOCK_SEED if seed is None else seed)
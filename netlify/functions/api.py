@@ -1,7 +1,18 @@
 import json
+import os
 import re
+import time
 from urllib.parse import unquote
 
+# Only /tmp is writable in the function container; the report snapshot,
+# mirror and write journal kept there survive between warm invocations
+os.environ.setdefault('DATA_DIR', '/tmp/telecaller_dashboard')
+
+import fast_json
+import profiling
+from profiling import span
+from report_serializer import MAX_PAGE_SIZE, RECENT_REPORT_FIELDS, as_report_frame, page_params, serialize_page
+
 # Try to import real processor, otherwise fall back to mock
 try:
     from data_processor import DataProcessor
@@ -10,22 +21,74 @@ except Exception:
     DataProcessor = None
     real_processor_available = False
 
-# Import MockProcessor from server.py to replicate server behavior without running the Flask app
+# The mock processor lives in its own module, so the function never loads Flask
 try:
-    from server import MockProcessor
+    from mock_processor import MockProcessor
 except Exception:
     MockProcessor = None
 
+# The processor is kept at module level so warm invocations reuse its
+# authenticated client, worksheets and report snapshot (which refreshes on
+# REPORTS_CACHE_TTL). It is rebuilt after PROCESSOR_TTL_SECONDS, or after
+# PROCESSOR_RETRY_SECONDS if it could not connect to Google Sheets.
+PROCESSOR_TTL_SECONDS = float(os.environ.get('NETLIFY_PROCESSOR_TTL', 3600))
+PROCESSOR_RETRY_SECONDS = float(os.environ.get('NETLIFY_PROCESSOR_RETRY_SECONDS', 60))
+_processor = None
+_processor_built_at = 0.0
+_processor_connected = False
+
+# NETLIFY_PROFILE=1 profiles every invocation: timing spans come back in a
+# Server-Timing header and slow invocations are logged. A PROFILE_SAMPLE_RATE
+# sample also runs under cProfile (see profiling.py).
+NETLIFY_PROFILE = os.environ.get('NETLIFY_PROFILE', '0') == '1'
+
 
 def _make_response(body, status=200, headers=None):
+    with span('serialize'):
+        body = fast_json.dumps(body)
     return {
         'statusCode': status,
-        'body': json.dumps(body),
+        'body': body,
         'headers': headers or {'Content-Type': 'application/json'}
     }
 
 
+def _report_page(df, query, default_fields=None, default_limit=20):
+    # Serialize one page of report rows, passing the next cursor in a header
+    df = as_report_frame(df if isinstance(df, list) or hasattr(df, 'columns') else [])
+    if df.empty:
+        return _make_response([])
+    try:
+        params = page_params(query, default_limit=default_limit)
+    except ValueError as e:
+        return _make_response({'error': f'Invalid paging parameters: {e}'}, status=400)
+    params['fields'] = params['fields'] or default_fields
+    with span('serialize'):
+        records, next_cursor = serialize_page(df, **params)
+    headers = {'Content-Type': 'application/json'}
+    if next_cursor:
+        headers['X-Next-Cursor'] = next_cursor
+    return _make_response(records, headers=headers)
+
+
 def _get_processor():
+    global _processor, _processor_built_at, _processor_connected
+    if _processor is not None:
+        max_age = PROCESSOR_TTL_SECONDS if _processor_connected else PROCESSOR_RETRY_SECONDS
+        if time.monotonic() - _processor_built_at < max_age:
+            return _processor
+        if hasattr(_processor, 'close'):
+            # Write rows still queued on the processor being replaced and release its journal
+            _processor.close()
+
+    _processor = _build_processor()
+    _processor_built_at = time.monotonic()
+    gs_service = getattr(_processor, 'gs_service', None)
+    _processor_connected = getattr(gs_service, 'spreadsheet', None) is not None
+    return _processor
+
+
+def _build_processor():
     if real_processor_available and DataProcessor:
         try:
             return DataProcessor()
@@ -38,6 +101,8 @@ def _get_processor():
     class _SimpleMock:
         def get_dashboard_stats(self, *_a, **_k):
             return {}
+        def get_dashboard_stats_multi(self, *_a, **_k):
+            return {'ranges': {}}
         def get_weekly_summary(self, *_a, **_k):
             return []
         def get_all_reports(self, *_a, **_k):
@@ -51,7 +116,7 @@ def _get_processor():
     return _SimpleMock()
 
 
-def _route(event_path, method, body=None):
+def _route(event_path, method, body=None, query=None):
     # Expect paths like /api/stats/today
     m = re.search(r"/api(?P<suffix>/.*)?$", event_path)
     suffix = m.group('suffix') if m else ''
@@ -60,8 +125,17 @@ def _route(event_path, method, body=None):
         return _make_response({'status': 'ok'})
 
     parts = [p for p in suffix.split('/') if p]
+    query = query or {}
     processor = _get_processor()
 
+    # /api/stats: every date range at once
+    if parts == ['stats']:
+        data = processor.get_dashboard_stats_multi(
+            telecaller=query.get('telecaller') or None,
+            by_telecaller=str(query.get('by_telecaller', '')).lower() in ('1', 'true', 'yes')
+        )
+        return _make_response(data)
+
     # /api/stats/<date_range>
     if len(parts) >= 2 and parts[0] == 'stats':
         date_range = parts[1]
@@ -75,26 +149,26 @@ def _route(event_path, method, body=None):
     if parts[0] == 'recent-reports':
         df = processor.get_all_reports()
         # DataProcessor returns a pandas DataFrame; Mock returns list
-        if hasattr(df, 'to_dict'):
-            rows = df.head(20).to_dict(orient='records')
-        else:
-            rows = df if isinstance(df, list) else []
-        return _make_response(rows)
+        return _report_page(df, query, default_fields=RECENT_REPORT_FIELDS)
 
     if parts[0] == 'performance-trend':
         data = processor.get_performance_trend()
         return _make_response(data)
 
     if parts[0] == 'video-activities':
-        data = processor.get_video_activities()
-        return _make_response(data)
+        if hasattr(processor, 'get_video_activity_frame'):
+            df = processor.get_video_activity_frame()
+        else:
+            df = processor.get_video_activities()
+        return _report_page(df, query, default_limit=MAX_PAGE_SIZE)
 
     if parts[0] == 'export-csv':
         # For serverless function return CSV as text/plain
         df = processor.get_all_reports()
         try:
             if hasattr(df, 'to_csv'):
-                csv = df.to_csv(index=False)
+                with span('serialize'):
+                    csv = df.to_csv(index=False)
             else:
                 # convert list of dicts to CSV minimal
                 import io, csv
@@ -122,39 +196,36 @@ def _route(event_path, method, body=None):
         except Exception:
             data = {}
         try:
-            success = processor.gs_service.add_report(data)
-            if success:
-                return _make_response({'message': 'Report added'}, status=201)
+            report_id = processor.gs_service.add_report(data)
+            if report_id:
+                # The function may be frozen after returning, so don't leave
+                # the row in the write-behind queue
+                processor.gs_service.flush_pending_writes()
+                return _make_response({'message': 'Report added', 'id': report_id}, status=201)
             return _make_response({'error': 'Failed to add report'}, status=500)
         except Exception as e:
             return _make_response({'error': str(e)}, status=500)
 
-    # update-report/{row_id} PUT
+    # update-report/{report_id} PUT
     if parts[0] == 'update-report' and len(parts) >= 2 and method == 'PUT':
-        try:
-            row_id = int(parts[1])
-        except Exception:
-            return _make_response({'error': 'Invalid row id'}, status=400)
+        report_id = parts[1]
         try:
             updates = json.loads(body) if body else {}
         except Exception:
             updates = {}
         try:
-            success = processor.gs_service.update_report(row_id, updates)
+            success = processor.gs_service.update_report(report_id, updates)
             if success:
                 return _make_response({'message': 'Updated'})
             return _make_response({'error': 'Update failed'}, status=500)
         except Exception as e:
             return _make_response({'error': str(e)}, status=500)
 
-    # delete-report/{row_id} DELETE
+    # delete-report/{report_id} DELETE
     if parts[0] == 'delete-report' and len(parts) >= 2 and method == 'DELETE':
+        report_id = parts[1]
         try:
-            row_id = int(parts[1])
-        except Exception:
-            return _make_response({'error': 'Invalid row id'}, status=400)
-        try:
-            success = processor.gs_service.delete_report(row_id)
+            success = processor.gs_service.delete_report(report_id)
             if success:
                 return _make_response({'message': 'Deleted'})
             return _make_response({'error': 'Delete failed'}, status=500)
@@ -170,4 +241,17 @@ def handler(event, context):
     method = event.get('httpMethod', 'GET')
     body = event.get('body')
     # Event bodies might be base64 encoded; Netlify normally sends raw string
-    return _route(unquote(path), method, body)
+    query = event.get('queryStringParameters') or {}
+    use_cprofile = profiling.sampled()
+    if not (NETLIFY_PROFILE or use_cprofile):
+        return _route(unquote(path), method, body, query)
+
+    profile = profiling.start_profile(f"{method} {path}", use_cprofile)
+    try:
+        response = _route(unquote(path), method, body, query)
+    finally:
+        profile.finish()
+    if NETLIFY_PROFILE:
+        response['headers'] = {**(response.get('headers') or {}), 'Server-Timing': profile.server_timing()}
+    profile.report_if_slow()
+    return response
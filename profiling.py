@@ -0,0 +1,149 @@
+# profiling.py
+import cProfile
+import hmac
+import logging
+import os
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+
+logger = logging.getLogger('telecaller_dashboard')
+
+# Requests at least this slow log their span breakdown and, if they ran
+# under cProfile, dump its stats to PROFILE_DUMP_DIR
+PROFILE_SLOW_MS = float(os.environ.get('PROFILE_SLOW_MS', 1000))
+
+# Fraction of all requests run under cProfile (0 = only on request)
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', 0))
+
+# Whether clients may ask for profiling (X-Profile header or ?profile= flag);
+# with PROFILE_TOKEN set they must also send it in an X-Profile-Token header
+PROFILE_OPT_IN = os.environ.get('PROFILE_OPT_IN', '0') == '1'
+PROFILE_TOKEN = os.environ.get('PROFILE_TOKEN', '')
+
+PROFILE_DUMP_DIR = Path(os.environ.get('PROFILE_DUMP_DIR', Path(os.environ.get('DATA_DIR', 'data')) / 'profiles'))
+
+# Only the newest this many cProfile dumps are kept
+PROFILE_MAX_DUMPS = int(os.environ.get('PROFILE_MAX_DUMPS', 20))
+
+# The profile of the request being served in this context, if it is profiled
+_current = ContextVar('profiling_current', default=None)
+
+# Only one cProfile can be active at a time; concurrent requests skip it
+_cprofile_lock = threading.Lock()
+
+
+class RequestProfile:
+    """Nested timing spans of one request, optionally with a cProfile of it.
+
+    Spans are keyed by their path ('fetch', 'fetch.sheets'); a span
+    entered more than once accumulates its time and count.
+    """
+
+    def __init__(self, label, use_cprofile=False):
+        self.label = label
+        self.spans = {}
+        self.total_ms = None
+        self._stack = []
+        self._token = None
+        self._profiler = None
+        self._use_cprofile = use_cprofile
+        self._start = None
+
+    def start(self):
+        self._token = _current.set(self)
+        if self._use_cprofile and _cprofile_lock.acquire(blocking=False):
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        self._start = time.perf_counter()
+        return self
+
+    def finish(self):
+        """Stop timing; safe to call more than once"""
+        if self.total_ms is not None:
+            return self
+        self.total_ms = (time.perf_counter() - self._start) * 1000
+        if self._profiler is not None:
+            self._profiler.disable()
+            _cprofile_lock.release()
+        _current.reset(self._token)
+        return self
+
+    def _record(self, path, seconds):
+        entry = self.spans.setdefault(path, [0.0, 0])
+        entry[0] += seconds * 1000
+        entry[1] += 1
+
+    def server_timing(self):
+        """Render the spans and the total as a Server-Timing header value"""
+        metrics = []
+        for path, (ms, count) in self.spans.items():
+            desc = f';desc="{count} calls"' if count > 1 else ''
+            metrics.append(f"{path};dur={ms:.1f}{desc}")
+        metrics.append(f"total;dur={self.total_ms:.1f}")
+        return ', '.join(metrics)
+
+    def report_if_slow(self, threshold_ms=None):
+        """Log the span breakdown of a slow request and dump its cProfile stats; returns the dump path"""
+        threshold_ms = PROFILE_SLOW_MS if threshold_ms is None else threshold_ms
+        if self.total_ms is None or self.total_ms < threshold_ms:
+            return None
+        logger.warning(f"Slow request {self.label}: {self.server_timing()}")
+        if self._profiler is None:
+            return None
+        PROFILE_DUMP_DIR.mkdir(parents=True, exist_ok=True)
+        name = re.sub(r'[^A-Za-z0-9_.-]+', '_', self.label).strip('_') or 'request'
+        path = PROFILE_DUMP_DIR / f"{time.strftime('%Y%m%d-%H%M%S')}-{name}-{self.total_ms:.0f}ms.prof"
+        self._profiler.dump_stats(path)
+        logger.warning(f"cProfile stats for {self.label} written to {path}")
+        _prune_dumps()
+        return path
+
+
+def _prune_dumps():
+    """Delete the oldest cProfile dumps beyond PROFILE_MAX_DUMPS"""
+    dumps = sorted(PROFILE_DUMP_DIR.glob('*.prof'), key=lambda p: p.stat().st_mtime)
+    for path in dumps[:max(len(dumps) - PROFILE_MAX_DUMPS, 0)]:
+        path.unlink(missing_ok=True)
+
+
+def opt_in_allowed(token=None):
+    """Check whether a client may ask for profiling, given the token it sent"""
+    if not PROFILE_OPT_IN:
+        return False
+    return not PROFILE_TOKEN or hmac.compare_digest((token or '').encode(), PROFILE_TOKEN.encode())
+
+
+def sampled():
+    """Decide whether a request is one of the PROFILE_SAMPLE_RATE sample run under cProfile"""
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+
+def start_profile(label, use_cprofile=False):
+    """Profile the rest of this context (request)"""
+    return RequestProfile(label, use_cprofile).start()
+
+
+def current_profile():
+    return _current.get()
+
+
+@contextmanager
+def span(name):
+    """Time a block as a span of the current request's profile; does nothing if it is not profiled"""
+    profile = _current.get()
+    if profile is None:
+        yield
+        return
+    profile._stack.append(name)
+    path = '.'.join(profile._stack)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile._record(path, time.perf_counter() - start)
+        profile._stack.pop()
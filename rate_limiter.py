@@ -0,0 +1,101 @@
+# rate_limiter.py
+import random
+import threading
+import time
+
+# HTTP statuses worth retrying: quota exhaustion and transient server errors
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+def status_code(error):
+    """Get the HTTP status of a failed API call, if the error carries one"""
+    code = getattr(error, 'code', None)
+    if isinstance(code, int):
+        return code
+    response = getattr(error, 'response', None)
+    return getattr(response, 'status_code', None)
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at a per-minute rate"""
+
+    def __init__(self, per_minute, capacity=None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self):
+        """Take a token; returns 0 on success or the seconds until one is available"""
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def drain(self):
+        """Empty the bucket so callers pause after the server reports exhaustion"""
+        self._refill()
+        self.tokens = min(self.tokens, 0.0)
+
+
+class SheetsRateLimiter:
+    """Shared read/write quota limiter with jittered exponential backoff.
+
+    Interactive callers take priority: background callers (the write-behind
+    queue) do not take a token while an interactive caller is waiting.
+    """
+
+    def __init__(self, reads_per_minute=60, writes_per_minute=60, max_retries=5,
+                 base_delay=1.0, max_delay=32.0):
+        self._buckets = {
+            'read': TokenBucket(reads_per_minute),
+            'write': TokenBucket(writes_per_minute)
+        }
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._cond = threading.Condition()
+        self._interactive_waiting = 0
+
+    def acquire(self, kind, background=False):
+        """Block until a token of the given kind ('read' or 'write') is available"""
+        bucket = self._buckets[kind]
+        with self._cond:
+            if not background:
+                self._interactive_waiting += 1
+            try:
+                while True:
+                    if background and self._interactive_waiting:
+                        self._cond.wait(0.05)
+                        continue
+                    wait = bucket.try_acquire()
+                    if not wait:
+                        return
+                    self._cond.wait(wait)
+            finally:
+                if not background:
+                    self._interactive_waiting -= 1
+                    self._cond.notify_all()
+
+    def call(self, kind, fn, *args, background=False, **kwargs):
+        """Call fn under the limiter, retrying quota and server errors with backoff"""
+        for attempt in range(self.max_retries + 1):
+            self.acquire(kind, background)
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                status = status_code(e)
+                if status not in RETRYABLE_STATUSES or attempt == self.max_retries:
+                    raise
+                if status == 429:
+                    # Everyone sharing this quota backs off, not just this caller
+                    with self._cond:
+                        self._buckets[kind].drain()
+                delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+                time.sleep(delay / 2 + random.uniform(0, delay / 2))
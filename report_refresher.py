@@ -0,0 +1,103 @@
+# report_refresher.py
+import logging
+import os
+import threading
+import time
+
+from sheets_metrics import sheets_metrics
+
+logger = logging.getLogger(__name__)
+
+# Seconds between background polls of the Reports sheet (0 disables the refresher)
+REPORTS_REFRESH_SECONDS = float(os.environ.get('REPORTS_REFRESH_SECONDS', 30))
+
+# Reads per refresh when local writes keep making the read stale before it is published
+REFRESH_ATTEMPTS = 3
+
+
+class ReportRefresher:
+    """Background thread that keeps a DataProcessor's reports and aggregates current.
+
+    Every interval it polls the Reports sheet through the SQLite mirror's
+    incremental sync (or by content hash without the mirror); when the sheet
+    changed, it rebuilds the sorted frame and the daily cube off the
+    request path and publishes them together. Requests keep being served from
+    the last published snapshot meanwhile, and after a failed poll.
+    """
+
+    def __init__(self, processor, interval=None):
+        self.processor = processor
+        self.interval = REPORTS_REFRESH_SECONDS if interval is None else interval
+        self.polls = 0
+        self.refreshes = 0
+        self.last_poll = None
+        self.last_change = None
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start polling in a daemon thread; the snapshot is no longer expired on request"""
+        if self._thread is not None:
+            return self
+        self.processor.gs_service.background_refresh = True
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='report-refresher', daemon=True)
+        self._thread.start()
+        logger.info(f"Report refresher polling every {self.interval:g}s")
+        return self
+
+    def stop(self, timeout=None):
+        """Stop polling; reads fall back to the snapshot TTL"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.processor.gs_service.background_refresh = False
+
+    def refresh_now(self):
+        """Poll the sheet and publish it if it changed; returns whether it did"""
+        # One poll at a time, whether from the thread or a Refresh button
+        with self._lock:
+            token = sheets_metrics.begin_scope('refresher')
+            try:
+                for _ in range(REFRESH_ATTEMPTS):
+                    poll = self.processor.gs_service.poll_reports()
+                    self.polls += 1
+                    self.last_poll = time.time()
+                    self.last_error = None
+                    if poll is None:
+                        return False
+                    if self.processor.publish_reports(poll):
+                        self.refreshes += 1
+                        self.last_change = self.last_poll
+                        return True
+                    # A report was added or edited while the sheet was being read
+                    logger.info("Reports changed locally during a poll; reading the sheet again")
+                return False
+            finally:
+                sheets_metrics.end_scope(token)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                if self.refresh_now():
+                    logger.info(f"Reports changed, published data version {self.processor.gs_service.data_version}")
+            except Exception as e:
+                # Keep serving the last published snapshot
+                self.last_error = str(e)
+                logger.warning(f"Background report refresh failed: {e}")
+            self._stop.wait(self.interval)
+
+    def status(self):
+        """Get the refresher's counters and the times of its last poll and change"""
+        return {
+            'running': self._thread is not None and self._thread.is_alive(),
+            'interval': self.interval,
+            'polls': self.polls,
+            'refreshes': self.refreshes,
+            'last_poll': self.last_poll,
+            'last_change': self.last_change,
+            'last_error': self.last_error,
+        }
@@ -0,0 +1,104 @@
+# report_schema.py
+import sys
+
+import pandas as pd
+
+# Canonical in-memory schema of the report frame, applied once at load time
+COUNT_COLUMNS = ['Total Calls', 'New Data', 'CRM Data', 'Fair Data', 'Visited Students']
+CATEGORICAL_COLUMNS = ['Telecaller', 'Day', 'Video', 'Country Data']
+TEXT_COLUMNS = ['Video Details', 'Other Work Description', 'Remarks']
+
+
+def _intern_text(value):
+    if value is None or (isinstance(value, float) and value != value):
+        return ''
+    return sys.intern(str(value))
+
+
+def apply_report_schema(df, date_format=None):
+    """Cast a report frame to the canonical compact schema.
+
+    Dates become datetime64, counts int32, low-cardinality labels
+    categorical and free text interned strings. Already canonical columns
+    are left as they are, so the function is cheap to re-apply.
+    """
+    if df.empty:
+        return df
+    df = df.copy()
+
+    if 'Date' in df.columns and not pd.api.types.is_datetime64_any_dtype(df['Date']):
+        df['Date'] = pd.to_datetime(df['Date'], format=date_format, errors='coerce')
+
+    for col in COUNT_COLUMNS:
+        if col in df.columns and df[col].dtype != 'int32':
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype('int32')
+
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].map(_intern_text).astype('category')
+
+    # Any other text column (free text and columns added to the sheet later)
+    for col in df.columns:
+        if df[col].dtype == object:
+            df[col] = df[col].map(_intern_text)
+
+    return df
+
+
+def concat_reports(frames):
+    """Concatenate canonical report frames, keeping categorical columns categorical"""
+    frames = [df for df in frames if not df.empty]
+    if not frames:
+        return pd.DataFrame()
+    frames = [df.copy() for df in frames]
+    for col in CATEGORICAL_COLUMNS:
+        if all(col in df.columns and isinstance(df[col].dtype, pd.CategoricalDtype) for df in frames):
+            categories = frames[0][col].cat.categories
+            for df in frames[1:]:
+                categories = categories.union(df[col].cat.categories)
+            for df in frames:
+                df[col] = df[col].cat.set_categories(categories)
+    return pd.concat(frames, ignore_index=True)
+
+
+def legacy_schema(df):
+    """Cast a report frame back to the object/int64 layout used before the compact schema"""
+    df = df.copy()
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype(object)
+        elif pd.api.types.is_integer_dtype(df[col]):
+            df[col] = df[col].astype('int64')
+    return df
+
+
+def _column_bytes(series, shared_strings):
+    """Estimate a column's memory; shared_strings counts each distinct string object once"""
+    if series.dtype != object:
+        return int(series.memory_usage(deep=True, index=False))
+    values = series.values
+    objects = {id(v): v for v in values}.values() if shared_strings else values
+    return int(values.nbytes + sum(sys.getsizeof(v) for v in objects))
+
+
+def memory_report(df):
+    """Compare the frame's bytes per row against the legacy object/int64 layout"""
+    rows = len(df)
+    legacy = legacy_schema(df)
+    columns = {}
+    for col in df.columns:
+        # A plain sheet read gives every row its own string objects
+        before = _column_bytes(legacy[col], shared_strings=False)
+        after = _column_bytes(df[col], shared_strings=True)
+        columns[col] = {'dtype': str(df[col].dtype), 'bytes_before': before, 'bytes_after': after}
+
+    bytes_before = sum(c['bytes_before'] for c in columns.values())
+    bytes_after = sum(c['bytes_after'] for c in columns.values())
+    return {
+        'rows': rows,
+        'bytes_before': bytes_before,
+        'bytes_after': bytes_after,
+        'bytes_per_row_before': round(bytes_before / rows, 1) if rows else 0,
+        'bytes_per_row_after': round(bytes_after / rows, 1) if rows else 0,
+        'columns': columns
+    }
@@ -0,0 +1,106 @@
+# report_serializer.py
+import os
+
+import numpy as np
+import pandas as pd
+
+from report_schema import COUNT_COLUMNS
+
+# Fields returned by /api/recent-reports when no projection is requested
+RECENT_REPORT_FIELDS = ['Date', 'Day', 'Total Calls', 'New Data', 'CRM Data', 'Country Data',
+                        'Fair Data', 'Video', 'Visited Students', 'Other Work Description', 'ID']
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = int(os.environ.get('MAX_PAGE_SIZE', 1000))
+
+
+def as_report_frame(data):
+    """Get report rows as a DataFrame; mock processors return plain lists of dicts"""
+    if isinstance(data, pd.DataFrame):
+        return data
+    df = pd.DataFrame(data)
+    if 'Date' in df.columns:
+        df['Date'] = pd.to_datetime(df['Date'])
+    return df
+
+
+def _column_values(df, field, date_format):
+    """Convert one column to a list of JSON-ready Python values"""
+    if field not in df.columns:
+        return [0 if field in COUNT_COLUMNS else ''] * len(df)
+    col = df[field]
+    if pd.api.types.is_datetime64_any_dtype(col):
+        return col.dt.strftime(date_format).fillna('').tolist()
+    if isinstance(col.dtype, pd.CategoricalDtype) or col.dtype == object:
+        return col.astype(object).where(col.notna(), '').tolist()
+    if pd.api.types.is_float_dtype(col):
+        # NaN is not valid JSON
+        return col.astype(object).where(col.notna(), None).tolist()
+    # Integer and boolean columns: tolist() yields native Python values
+    return col.tolist()
+
+
+def serialize_reports(df, fields=None, date_format='%Y-%m-%d'):
+    """Turn a report frame into JSON-ready records, converting column by column.
+
+    fields projects (and orders) the output; requested fields the frame
+    lacks come out as 0 for counts and '' otherwise.
+    """
+    fields = list(fields) if fields else list(df.columns)
+    columns = [_column_values(df, field, date_format) for field in fields]
+    return [dict(zip(fields, values)) for values in zip(*columns)]
+
+
+def _make_cursor(row):
+    """Encode a report's position in newest-first order as an opaque cursor"""
+    return f"{pd.Timestamp(row['Date']).isoformat()}~{row.get('ID', '')}"
+
+
+def _cursor_start(df, cursor):
+    """Get the position just past the report a cursor points at in a newest-first frame"""
+    date_text, _, report_id = cursor.partition('~')
+    when = pd.Timestamp(date_text).to_datetime64()
+    # Dates descend, so search the reversed (ascending) array
+    ascending = df['Date'].values[::-1]
+    first_tie = len(df) - ascending.searchsorted(when, 'right')
+    after_ties = len(df) - ascending.searchsorted(when, 'left')
+    if report_id and 'ID' in df.columns:
+        # Reports sharing the cursor's date are told apart by ID
+        matches = np.flatnonzero(df['ID'].values[first_tie:after_ties] == report_id)
+        if len(matches):
+            return first_tie + int(matches[0]) + 1
+    return after_ties
+
+
+def paginate_reports(df, offset=0, limit=None, cursor=None):
+    """Slice a newest-first report frame to one page; returns (page, next_cursor).
+
+    A cursor resumes after the last report of a previous page, and stays
+    correct when newer reports are added in between; offset then skips
+    further rows. next_cursor is None on the last page.
+    """
+    start = _cursor_start(df, cursor) if cursor and not df.empty else 0
+    start += offset
+    stop = len(df) if limit is None else start + limit
+    page = df.iloc[start:stop]
+    next_cursor = _make_cursor(page.iloc[-1]) if stop < len(df) and not page.empty else None
+    return page, next_cursor
+
+
+def page_params(args, default_limit=DEFAULT_PAGE_SIZE):
+    """Read offset, limit, cursor and fields from query parameters; raises ValueError on bad input"""
+    offset = int(args.get('offset') or 0)
+    limit = int(args.get('limit') or default_limit)
+    if offset < 0 or limit < 1:
+        raise ValueError('offset must be >= 0 and limit >= 1')
+    cursor = args.get('cursor') or None
+    if cursor:
+        pd.Timestamp(cursor.partition('~')[0])
+    fields = [f.strip() for f in (args.get('fields') or '').split(',') if f.strip()]
+    return {'offset': offset, 'limit': min(limit, MAX_PAGE_SIZE), 'cursor': cursor, 'fields': fields or None}
+
+
+def serialize_page(df, offset=0, limit=None, cursor=None, fields=None, date_format='%Y-%m-%d'):
+    """Paginate a newest-first report frame and serialize the page; returns (records, next_cursor)"""
+    page, next_cursor = paginate_reports(df, offset, limit, cursor)
+    return serialize_reports(page, fields, date_format), next_cursor
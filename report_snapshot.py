@@ -0,0 +1,52 @@
+# report_snapshot.py
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+from report_schema import apply_report_schema
+
+logger = logging.getLogger(__name__)
+
+
+def default_snapshot_path():
+    """Get the configured snapshot file, or None when snapshots are disabled"""
+    path = os.environ.get('REPORTS_SNAPSHOT')
+    if path is None:
+        return Path(os.environ.get('DATA_DIR', 'data')) / 'reports_snapshot.parquet'
+    return Path(path) if path else None
+
+
+def write_snapshot(df, path):
+    """Write a Parquet snapshot of the report frame in the canonical schema; returns True on success"""
+    tmp_path = None
+    try:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # A temp file per write, so concurrent writers (threads or worker
+        # processes) never interleave into the same file before the rename
+        with tempfile.NamedTemporaryFile(dir=path.parent, prefix=path.name + '.', suffix='.tmp',
+                                         delete=False) as tmp:
+            tmp_path = tmp.name
+        apply_report_schema(df).to_parquet(tmp_path, index=True)
+        os.replace(tmp_path, path)
+        return True
+    except Exception as e:
+        logger.warning(f"Could not write report snapshot to {path}: {str(e)}")
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        return False
+
+
+def load_snapshot(path):
+    """Load a report snapshot, or None if there is no usable snapshot"""
+    path = Path(path)
+    if not path.exists():
+        return None
+    try:
+        return pd.read_parquet(path)
+    except Exception as e:
+        logger.warning(f"Could not load report snapshot from {path}: {str(e)}")
+        return None
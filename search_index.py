@@ -0,0 +1,65 @@
+# search_index.py
+import threading
+
+# Free-text columns covered by the Daily Reports search box
+SEARCH_COLUMNS = ['Telecaller', 'Country Data', 'Video Details', 'Other Work Description', 'Remarks']
+
+
+def _trigrams(text):
+    """Get the set of three-character substrings of a string"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class ReportSearchIndex:
+    """Trigram index over the text columns of the report frame, keyed by row id.
+
+    Searches may run while rows are being added from another thread; both
+    take the index lock.
+    """
+
+    def __init__(self, columns=None):
+        self.columns = columns or SEARCH_COLUMNS
+        self._docs = {}
+        self._postings = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._docs)
+
+    def add_rows(self, df):
+        """Index the text columns of the given rows under their index labels"""
+        columns = [col for col in self.columns if col in df.columns]
+        if df.empty or not columns:
+            return
+
+        # One lowercased document per row; fields are joined with a newline so
+        # a search term can never match across two columns
+        text = df[columns[0]].astype(object).fillna('').astype(str)
+        for col in columns[1:]:
+            text = text + '\n' + df[col].astype(object).fillna('').astype(str)
+
+        docs = list(zip(df.index, text.str.lower()))
+        with self._lock:
+            for row_id, doc in docs:
+                self._docs[row_id] = doc
+                for trigram in _trigrams(doc):
+                    self._postings.setdefault(trigram, set()).add(row_id)
+
+    def search(self, term):
+        """Get the ids of rows whose text columns contain the term (case-insensitive)"""
+        term = term.lower()
+        with self._lock:
+            if len(term) < 3:
+                candidates = self._docs.keys()
+            else:
+                postings = []
+                for trigram in _trigrams(term):
+                    rows = self._postings.get(trigram)
+                    if not rows:
+                        return set()
+                    postings.append(rows)
+                postings.sort(key=len)
+                candidates = set.intersection(*postings)
+
+            # Trigram hits are only candidates; confirm the full substring
+            return {row_id for row_id in candidates if term in self._docs[row_id]}
@@ -1,154 +1,191 @@
-from flask import Flask, jsonify, request, send_from_directory, Response
+from flask import Flask, g, jsonify, request, send_from_directory, Response, make_response
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
 import os
-import io
-import pandas as pd
+import functools
+import threading
+import uuid
+import zlib
+from collections import OrderedDict
 from data_processor import DataProcessor
-import random
-from datetime import datetime, timedelta
-
-
-# Simple mock processor used when Google Sheets access is unavailable
-class MockProcessor:
-    def __init__(self):
-        random.seed(42)
-        today = datetime.now().date()
-        # create 30 days of sample data
-        self.rows = []
-        for i in range(30):
-            d = today - timedelta(days=i)
-            total_calls = random.randint(0, 200)
-            new_data = random.randint(0, max(1, total_calls//3))
-            crm = random.randint(0, total_calls)
-            visited = random.randint(0, 10)
-            video = 'Yes' if random.random() < 0.15 else 'No'
-            self.rows.append({
-                'Date': d,
-                'Day': d.strftime('%A'),
-                'Total Calls': total_calls,
-                'New Data': new_data,
-                'CRM Data': crm,
-                'Country Data': random.choice(['', 'UK', 'Australia', 'Canada', 'USA', 'Other']),
-                'Fair Data': random.randint(0, 50),
-                'Video': video,
-                'Visited Students': visited,
-                'Other Work Description': ''
-            })
-
-    def get_dashboard_stats(self, date_range='all'):
-        df_rows = self.rows.copy()
-        # filter by date_range
-        today = datetime.now().date()
-        if date_range == 'today':
-            df_rows = [r for r in df_rows if r['Date'] == today]
-        elif date_range == 'yesterday':
-            df_rows = [r for r in df_rows if r['Date'] == (today - timedelta(days=1))]
-        elif date_range == 'week':
-            cutoff = today - timedelta(days=7)
-            df_rows = [r for r in df_rows if r['Date'] >= cutoff]
-        elif date_range == 'month':
-            cutoff = today - timedelta(days=30)
-            df_rows = [r for r in df_rows if r['Date'] >= cutoff]
-
-        total_calls = sum(r['Total Calls'] for r in df_rows)
-        new_data = sum(r['New Data'] for r in df_rows)
-        crm_data = sum(r['CRM Data'] for r in df_rows)
-        country_data = sum(1 for r in df_rows if r.get('Country Data'))
-        fair_data = sum(r.get('Fair Data', 0) for r in df_rows)
-        visited_students = sum(r.get('Visited Students', 0) for r in df_rows)
-        video_activities = sum(1 for r in df_rows if r.get('Video') == 'Yes')
-        total_days = len({r['Date'] for r in df_rows})
-
-        avg_calls = round(total_calls / total_days, 1) if total_days else 0
-        avg_new = round(new_data / total_days, 1) if total_days else 0
-        conversion_rate = round((new_data / total_calls) * 100, 1) if total_calls else 0
-        crm_completion_rate = round((crm_data / total_calls) * 100, 1) if total_calls else 0
-
-        return {
-            'total_calls': total_calls,
-            'new_data': new_data,
-            'crm_data': crm_data,
-            'country_data': country_data,
-            'fair_data': fair_data,
-            'visited_students': visited_students,
-            'video_activities': video_activities,
-            'total_days': total_days,
-            'avg_calls_per_day': avg_calls,
-            'avg_new_data_per_day': avg_new,
-            'conversion_rate': conversion_rate,
-            'crm_completion_rate': crm_completion_rate
-        }
-
-    def get_weekly_summary(self, days=7):
-        today = datetime.now().date()
-        summary = []
-        for i in range(days):
-            d = today - timedelta(days=i)
-            row = next((r for r in self.rows if r['Date'] == d), None)
-            if row:
-                summary.append({
-                    'date': d.strftime('%Y-%m-%d'),
-                    'formatted_date': d.strftime('%a, %b %d'),
-                    'total_calls': row['Total Calls'],
-                    'new_data': row['New Data'],
-                    'visited_students': row['Visited Students'],
-                    'video': row['Video']
-                })
-        return summary
-
-    def get_all_reports(self, filters=None):
-        # return a pandas-like DataFrame substitute as list of dicts
-        # The server expects a DataFrame in processor.get_all_reports, but we will
-        # return a simple list and handle it in endpoints
-        return self.rows
-
-    def get_performance_trend(self, days=30):
-        today = datetime.now().date()
-        trend = []
-        for i in range(days):
-            d = today - timedelta(days=(days - 1 - i))
-            row = next((r for r in self.rows if r['Date'] == d), None)
-            trend.append({
-                'date': d.strftime('%Y-%m-%d'),
-                'formatted_date': d.strftime('%b %d'),
-                'total_calls': row['Total Calls'] if row else 0,
-                'new_data': row['New Data'] if row else 0,
-                'visited_students': row['Visited Students'] if row else 0
-            })
-        return trend
-
-    def get_video_activities(self, limit=10):
-        vids = [r for r in self.rows if r['Video'] == 'Yes']
-        out = []
-        for r in vids[:limit]:
-            out.append({
-                'date': r['Date'].strftime('%Y-%m-%d'),
-                'formatted_date': r['Date'].strftime('%b %d, %Y'),
-                'video_details': r.get('Other Work Description', ''),
-                'other_work': r.get('Other Work Description', ''),
-                'total_calls': r['Total Calls'],
-                'new_data': r['New Data']
-            })
-        return out
+from mock_processor import MockProcessor
+import fast_json
+from sheets_metrics import sheets_metrics
+import profiling
+from profiling import span
+from report_serializer import MAX_PAGE_SIZE, RECENT_REPORT_FIELDS, page_params, serialize_page
+from datetime import datetime, timezone
+
+# Number of rendered API responses kept for the current data version
+RESPONSE_CACHE_SIZE = int(os.environ.get('RESPONSE_CACHE_SIZE', 256))
+
+# Rows rendered per chunk of a streamed CSV export
+EXPORT_CHUNK_ROWS = int(os.environ.get('EXPORT_CHUNK_ROWS', 5000))
+
+
+class FastJSONProvider(JSONProvider):
+    """Flask JSON provider backed by fast_json (orjson when installed)"""
+    sort_keys = True
+
+    def dumps(self, obj, **kwargs):
+        return fast_json.dumps(obj, sort_keys=kwargs.get('sort_keys', self.sort_keys))
+
+    def loads(self, s, **kwargs):
+        return fast_json.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Encode straight to bytes instead of going through a str
+        obj = self._prepare_response_obj(args, kwargs)
+        with span('serialize'):
+            body = fast_json.dumps_bytes(obj, self.sort_keys)
+        return self._app.response_class(body, mimetype='application/json')
+
 
 app = Flask(__name__, static_folder='.')
+app.json = FastJSONProvider(app)
 CORS(app)
 
 # Lazily create processor so the server can start even if Google creds are missing
 _processor = None
+# Concurrent first requests must not each build a processor, with its own
+# refresher and write-behind queue
+_processor_lock = threading.Lock()
 
 def get_processor():
     global _processor
     if _processor is None:
-        try:
-            _processor = DataProcessor()
-        except Exception as e:
-            app.logger.error(f"Failed to initialize DataProcessor: {e}")
-            # Fall back to mock processor so API remains usable without credentials
-            _processor = MockProcessor()
+        with _processor_lock:
+            if _processor is None:
+                _processor = _build_processor()
     return _processor
 
 
+def _build_processor():
+    try:
+        processor = DataProcessor()
+        # Reports and aggregates are rebuilt off the request path from now on
+        processor.start_background_refresh()
+        return processor
+    except Exception as e:
+        app.logger.error(f"Failed to initialize DataProcessor: {e}")
+        # Fall back to mock processor so API remains usable without credentials
+        return MockProcessor()
+
+
+@app.before_request
+def begin_metrics_scope():
+    # Sheets requests made while serving a request are attributed to its endpoint
+    if request.endpoint and request.endpoint != 'metrics':
+        g.metrics_scope = sheets_metrics.begin_scope(f'api:{request.endpoint}')
+
+
+@app.teardown_request
+def end_metrics_scope(error=None):
+    token = g.pop('metrics_scope', None)
+    if token is not None:
+        sheets_metrics.end_scope(token)
+
+
+# Opt-in profiling, off unless PROFILE_OPT_IN=1 (and gated by PROFILE_TOKEN if
+# set): an X-Profile header or ?profile= flag ('cprofile' also runs cProfile)
+# returns timing spans in a Server-Timing header; a PROFILE_SAMPLE_RATE sample of
+# all requests runs under cProfile, dumped when slower than PROFILE_SLOW_MS.
+# A streamed export's header only covers the work done before streaming starts.
+@app.before_request
+def begin_profile():
+    flag = None
+    if profiling.opt_in_allowed(request.headers.get('X-Profile-Token')):
+        flag = request.headers.get('X-Profile') or request.args.get('profile')
+    use_cprofile = flag == 'cprofile' or profiling.sampled()
+    if flag or use_cprofile:
+        g.profile = profiling.start_profile(request.endpoint or request.path, use_cprofile)
+        g.profile_requested = bool(flag)
+
+
+@app.after_request
+def end_profile(response):
+    profile = g.pop('profile', None)
+    if profile is not None:
+        profile.finish()
+        if g.get('profile_requested'):
+            response.headers['Server-Timing'] = profile.server_timing()
+        profile.report_if_slow()
+    return response
+
+
+@app.teardown_request
+def discard_profile(error=None):
+    # after_request is skipped when the view raised
+    profile = g.pop('profile', None)
+    if profile is not None:
+        profile.finish().report_if_slow()
+
+
+# Conditional GET support and a response cache for the polled read endpoints.
+# Validators derive from the report data version (and the day, since ranges
+# like "today" move at midnight); the boot ID keeps ETags from one process
+# from matching after a restart resets the version counter.
+_BOOT_ID = uuid.uuid4().hex[:8]
+_response_cache = OrderedDict()
+_response_cache_lock = threading.Lock()
+_validators = {'key': None, 'last_modified': None}
+
+
+def _data_validators(processor):
+    """Get the ETag and Last-Modified time of the processor's current data"""
+    key = (getattr(processor, 'data_version', 0), datetime.now().date())
+    with _response_cache_lock:
+        if _validators['key'] != key:
+            # New data: responses rendered for the old version are dead
+            _validators['key'] = key
+            _validators['last_modified'] = datetime.now(timezone.utc).replace(microsecond=0)
+            _response_cache.clear()
+        last_modified = _validators['last_modified']
+    return f"{_BOOT_ID}-{key[0]}-{key[1]:%Y%m%d}", last_modified
+
+
+def cached_response(view):
+    """Serve a GET endpoint with ETag/Last-Modified validation and a per-version response cache"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        processor = get_processor()
+        if not processor:
+            return view(*args, **kwargs)
+
+        etag, last_modified = _data_validators(processor)
+        if request.if_none_match:
+            not_modified = request.if_none_match.contains_weak(etag)
+        else:
+            not_modified = bool(request.if_modified_since and last_modified <= request.if_modified_since)
+        if not_modified:
+            response = Response(status=304)
+        else:
+            key = (request.endpoint, tuple(sorted(kwargs.items())),
+                   tuple(sorted(request.args.items(multi=True))), etag)
+            with _response_cache_lock:
+                cached = _response_cache.get(key)
+                if cached is not None:
+                    _response_cache.move_to_end(key)
+            if cached is None:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                cached = (response.get_data(), response.mimetype,
+                          [(name, value) for name, value in response.headers if name.startswith('X-')])
+                with _response_cache_lock:
+                    _response_cache[key] = cached
+                    while len(_response_cache) > RESPONSE_CACHE_SIZE:
+                        _response_cache.popitem(last=False)
+            response = Response(cached[0], mimetype=cached[1], headers=cached[2])
+
+        response.set_etag(etag)
+        response.last_modified = last_modified
+        # Let browsers keep the body but revalidate on every poll
+        response.cache_control.no_cache = True
+        return response
+    return wrapper
+
+
 @app.route('/')
 def root():
     # Serve dashboard.html if present
@@ -157,7 +194,21 @@ def root():
     return jsonify({'status': 'ok'})
 
 
+@app.route('/api/stats', methods=['GET'])
+@cached_response
+def api_stats_multi():
+    processor = get_processor()
+    if not processor:
+        return jsonify({'error': 'Data processor unavailable'}), 503
+    stats = processor.get_dashboard_stats_multi(
+        telecaller=request.args.get('telecaller') or None,
+        by_telecaller=request.args.get('by_telecaller', '').lower() in ('1', 'true', 'yes')
+    )
+    return jsonify(stats)
+
+
 @app.route('/api/stats/<date_range>', methods=['GET'])
+@cached_response
 def api_stats(date_range):
     processor = get_processor()
     if not processor:
@@ -167,6 +218,7 @@ def api_stats(date_range):
 
 
 @app.route('/api/weekly-summary', methods=['GET'])
+@cached_response
 def api_weekly():
     processor = get_processor()
     if not processor:
@@ -175,7 +227,23 @@ def api_weekly():
     return jsonify(data)
 
 
+def _report_page(df, default_fields=None, default_limit=20):
+    """Serialize one page of a newest-first report frame per the request's paging parameters"""
+    try:
+        params = page_params(request.args, default_limit=default_limit)
+    except ValueError as e:
+        return jsonify({'error': f'Invalid paging parameters: {e}'}), 400
+    params['fields'] = params['fields'] or default_fields
+    with span('serialize'):
+        records, next_cursor = serialize_page(df, **params)
+    response = jsonify(records)
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
+
+
 @app.route('/api/recent-reports', methods=['GET'])
+@cached_response
 def api_recent():
     processor = get_processor()
     if not processor:
@@ -185,25 +253,11 @@ def api_recent():
     if df.empty:
         return jsonify([])
 
-    records = []
-    for _, row in df.head(20).iterrows():
-        records.append({
-            'Date': row['Date'].strftime('%Y-%m-%d') if pd.notna(row['Date']) else '',
-            'Day': row.get('Day', ''),
-            'Total Calls': int(row.get('Total Calls', 0)),
-            'New Data': int(row.get('New Data', 0)),
-            'CRM Data': int(row.get('CRM Data', 0)),
-            'Country Data': row.get('Country Data', ''),
-            'Fair Data': int(row.get('Fair Data', 0)) if 'Fair Data' in row else 0,
-            'Video': row.get('Video', 'No'),
-            'Visited Students': int(row.get('Visited Students', 0)) if 'Visited Students' in row else 0,
-            'Other Work Description': row.get('Other Work Description', '')
-        })
-
-    return jsonify(records)
+    return _report_page(df, default_fields=RECENT_REPORT_FIELDS)
 
 
 @app.route('/api/performance-trend', methods=['GET'])
+@cached_response
 def api_trend():
     processor = get_processor()
     if not processor:
@@ -213,12 +267,38 @@ def api_trend():
 
 
 @app.route('/api/video-activities', methods=['GET'])
+@cached_response
 def api_videos():
     processor = get_processor()
     if not processor:
         return jsonify([])
-    data = processor.get_video_activities()
-    return jsonify(data)
+    df = processor.get_video_activity_frame()
+    if df.empty:
+        return jsonify([])
+
+    return _report_page(df, default_limit=MAX_PAGE_SIZE)
+
+
+def _report_chunks(processor, filters):
+    """Iterate filtered report frames newest first, in chunks of EXPORT_CHUNK_ROWS"""
+    return processor.iter_reports(filters, chunk_rows=EXPORT_CHUNK_ROWS)
+
+
+def _csv_stream(first_chunk, chunks):
+    """Render report frames as CSV text, header first, one chunk at a time"""
+    yield first_chunk.to_csv(index=False)
+    for chunk in chunks:
+        yield chunk.to_csv(index=False, header=False)
+
+
+def _gzip_stream(text_chunks):
+    """Gzip a stream of text chunks incrementally"""
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    for text in text_chunks:
+        data = compressor.compress(text.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
 
 
 @app.route('/api/export-csv', methods=['GET'])
@@ -227,30 +307,29 @@ def api_export():
     if not processor:
         return jsonify({'error': 'Data processor unavailable'}), 503
 
-    df = processor.get_all_reports()
-    if df.empty:
+    filters = {}
+    try:
+        for param in ('start_date', 'end_date'):
+            if request.args.get(param):
+                filters[param] = datetime.strptime(request.args[param], '%Y-%m-%d').date()
+    except ValueError:
+        return jsonify({'error': 'Dates must be in YYYY-MM-DD format'}), 400
+    if request.args.get('telecaller'):
+        filters['telecaller'] = request.args['telecaller']
+
+    # Rows are rendered as they are sent, so memory stays at one chunk of CSV
+    chunks = _report_chunks(processor, filters)
+    first_chunk = next(chunks, None)
+    if first_chunk is None:
         return jsonify({'error': 'No data to export'}), 404
 
-    csv_io = io.StringIO()
-    df.to_csv(csv_io, index=False)
-    csv_io.seek(0)
-
-    return Response(
-        csv_io.getvalue(),
-        mimetype='text/csv',
-        headers={"Content-disposition": "attachment; filename=telecaller_reports.csv"}
-    )
-
+    body = _csv_stream(first_chunk, chunks)
+    headers = {"Content-disposition": "attachment; filename=telecaller_reports.csv", "Vary": "Accept-Encoding"}
+    if 'gzip' in request.accept_encodings:
+        body = _gzip_stream(body)
+        headers['Content-Encoding'] = 'gzip'
 
-def find_row_index_by_date(sheet_rows, date_value):
-    # sheet_rows is list of lists including header at index 0
-    for idx, row in enumerate(sheet_rows[1:], start=2):
-        if not row:
-            continue
-        first_cell = str(row[0])
-        if date_value in first_cell or first_cell in date_value:
-            return idx
-    return None
+    return Response(body, mimetype='text/csv', headers=headers)
 
 
 @app.route('/add-report', methods=['POST'])
@@ -261,25 +340,24 @@ def add_report():
         return jsonify({'error': 'Data processor unavailable'}), 503
 
     try:
-        success = processor.gs_service.add_report(data)
-        if success:
-            return jsonify({'message': 'Report added'}), 201
+        report_id = processor.gs_service.add_report(data)
+        if report_id:
+            return jsonify({'message': 'Report added', 'id': report_id}), 201
         return jsonify({'error': 'Failed to add report'}), 500
     except Exception as e:
         app.logger.error(f"Error adding report: {e}")
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/api/update-report/<int:row_id>', methods=['PUT'])
-def update_report(row_id):
+@app.route('/api/update-report/<report_id>', methods=['PUT'])
+def update_report(report_id):
     updates = request.get_json()
     processor = get_processor()
     if not processor:
         return jsonify({'error': 'Data processor unavailable'}), 503
 
-    # If row_id is provided as sheet row index, attempt update
     try:
-        success = processor.gs_service.update_report(row_id, updates)
+        success = processor.gs_service.update_report(report_id, updates)
         if success:
             return jsonify({'message': 'Updated'}), 200
         return jsonify({'error': 'Update failed'}), 500
@@ -287,14 +365,14 @@ def update_report(row_id):
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/api/delete-report/<int:row_id>', methods=['DELETE'])
-def delete_report(row_id):
+@app.route('/api/delete-report/<report_id>', methods=['DELETE'])
+def delete_report(report_id):
     processor = get_processor()
     if not processor:
         return jsonify({'error': 'Data processor unavailable'}), 503
 
     try:
-        success = processor.gs_service.delete_report(row_id)
+        success = processor.gs_service.delete_report(report_id)
         if success:
             return jsonify({'message': 'Deleted'}), 200
         return jsonify({'error': 'Delete failed'}), 500
@@ -302,5 +380,20 @@ def delete_report(row_id):
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    # Sheets API request counters and latency histograms, per endpoint;
+    # Prometheus text by default, ?format=json for JSON with per-endpoint totals
+    if request.args.get('format') == 'json':
+        return jsonify({**sheets_metrics.snapshot(), 'sources': sheets_metrics.by_source()})
+    return Response(sheets_metrics.prometheus_text(), mimetype='text/plain; version=0.0.4')
+
+
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    debug = True
+    # With the reloader this script also runs in a watcher process that never
+    # serves requests; only the serving process builds the processor early
+    if not debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        # Load the snapshot and start the background refresher before the first request
+        get_processor()
+    app.run(host='0.0.0.0', port=5000, debug=debug)
@@ -0,0 +1,32 @@
+# sheet_utils.py
+# Small sheet helpers kept free of gspread, so importing the data layer
+# does not load the Google client libraries
+
+
+def column_letter(col):
+    """Convert a 1-based column number to its A1 letters (1 -> A, 27 -> AA)"""
+    letters = ''
+    while col > 0:
+        col, remainder = divmod(col - 1, 26)
+        letters = chr(ord('A') + remainder) + letters
+    return letters
+
+
+def rowcol_to_a1(row, col):
+    """Convert a 1-based (row, column) pair to A1 notation, like gspread.utils.rowcol_to_a1"""
+    return f"{column_letter(col)}{row}"
+
+
+def column_number(letters):
+    """Convert A1 column letters to a 1-based column number (A -> 1, AA -> 27)"""
+    col = 0
+    for char in letters.upper():
+        col = col * 26 + ord(char) - ord('A') + 1
+    return col
+
+
+def a1_to_rowcol(label):
+    """Convert one A1 cell reference to a 1-based (row, column) pair; either is None when omitted ('N', '5')"""
+    letters = label.rstrip('0123456789')
+    digits = label[len(letters):]
+    return (int(digits) if digits else None), (column_number(letters) if letters else None)
@@ -0,0 +1,173 @@
+# sheets_metrics.py
+import threading
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+
+from rate_limiter import status_code
+
+# Upper bounds (seconds) of the request latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# What the current code path is serving (a Flask endpoint, a Streamlit page);
+# Sheets requests are attributed to it
+_source = ContextVar('sheets_metrics_source', default='other')
+
+
+def outcome_of(error):
+    """Classify a request's result: ok, quota (429), server_error (5xx) or error"""
+    if error is None:
+        return 'ok'
+    status = status_code(error)
+    if status == 429:
+        return 'quota'
+    if status is not None and status >= 500:
+        return 'server_error'
+    return 'error'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+
+class SheetsMetrics:
+    """Counters and latency histograms of Sheets API requests.
+
+    Series are labeled by source, method, worksheet and outcome. Every
+    attempt is one request, so retried quota errors show up as well.
+    Sources also count their runs (requests served, page reruns), which
+    gives the Sheets requests per run.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            # (source, method, worksheet, outcome) -> [count, seconds, bucket counts...]
+            self._series = defaultdict(lambda: [0, 0.0] + [0] * (len(self.buckets) + 1))
+            self._runs = defaultdict(int)
+            self.started_at = time.time()
+
+    def begin_scope(self, source):
+        """Attribute the Sheets requests that follow in this context (thread) to source; returns a token for end_scope"""
+        with self._lock:
+            self._runs[source] += 1
+        return _source.set(source)
+
+    def end_scope(self, token):
+        """Restore the source that was current before begin_scope"""
+        _source.reset(token)
+
+    def observe(self, method, worksheet, outcome, seconds, source=None):
+        """Record one request"""
+        key = (source or _source.get(), method, worksheet, outcome)
+        bucket = next((i for i, bound in enumerate(self.buckets) if seconds <= bound), len(self.buckets))
+        with self._lock:
+            series = self._series[key]
+            series[0] += 1
+            series[1] += seconds
+            series[2 + bucket] += 1
+
+    def measured(self, fn, source=None):
+        """Wrap a bound gspread method so each call is recorded as one request"""
+        owner = getattr(fn, '__self__', None)
+        method = getattr(fn, '__name__', 'call')
+        # Worksheets have a grid size; spreadsheets and clients are labeled ''
+        worksheet = owner.title if hasattr(owner, 'col_count') else ''
+
+        def call(*args, **kwargs):
+            start = time.perf_counter()
+            error = None
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                error = e
+                raise
+            finally:
+                self.observe(method, worksheet, outcome_of(error), time.perf_counter() - start, source)
+        return call
+
+    def _quantile_ms(self, counts, total, q):
+        """Estimate a latency quantile in ms as the upper bound of its bucket; None past the last bucket"""
+        target, seen = q * total, 0
+        for bound, count in zip(self.buckets, counts):
+            seen += count
+            if seen >= target:
+                return round(bound * 1000, 1)
+        return None
+
+    def snapshot(self):
+        """Get every series with its count, total seconds and estimated p50/p95, plus runs per source"""
+        with self._lock:
+            series = {key: list(values) for key, values in self._series.items()}
+            runs = dict(self._runs)
+        rows = []
+        for (source, method, worksheet, outcome), values in sorted(series.items()):
+            count, seconds, counts = values[0], values[1], values[2:]
+            rows.append({
+                'source': source, 'method': method, 'worksheet': worksheet, 'outcome': outcome,
+                'count': count, 'seconds': round(seconds, 6),
+                'p50_ms': self._quantile_ms(counts, count, 0.5),
+                'p95_ms': self._quantile_ms(counts, count, 0.95),
+                'buckets': counts
+            })
+        return {'started_at': self.started_at, 'series': rows, 'runs': runs}
+
+    def by_source(self):
+        """Summarize requests per source: runs, requests, quota errors and requests per run"""
+        snapshot = self.snapshot()
+        totals = defaultdict(lambda: {'requests': 0, 'quota_errors': 0, 'errors': 0, 'seconds': 0.0})
+        for row in snapshot['series']:
+            total = totals[row['source']]
+            total['requests'] += row['count']
+            total['seconds'] += row['seconds']
+            if row['outcome'] == 'quota':
+                total['quota_errors'] += row['count']
+            elif row['outcome'] != 'ok':
+                total['errors'] += row['count']
+        summary = []
+        for source in sorted(set(totals) | set(snapshot['runs'])):
+            runs = snapshot['runs'].get(source, 0)
+            total = totals[source]
+            summary.append({'source': source, 'runs': runs, **total, 'seconds': round(total['seconds'], 3),
+                            'requests_per_run': round(total['requests'] / runs, 2) if runs else None})
+        return summary
+
+    def prometheus_text(self):
+        """Render the metrics in the Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        lines = ['# HELP sheets_api_requests_total Sheets API requests made by this process.',
+                 '# TYPE sheets_api_requests_total counter']
+        for row in snapshot['series']:
+            labels = _labels(source=row['source'], method=row['method'],
+                             worksheet=row['worksheet'], outcome=row['outcome'])
+            lines.append(f"sheets_api_requests_total{labels} {row['count']}")
+
+        lines += ['# HELP sheets_api_request_seconds Latency of Sheets API requests.',
+                  '# TYPE sheets_api_request_seconds histogram']
+        for row in snapshot['series']:
+            base = dict(source=row['source'], method=row['method'],
+                        worksheet=row['worksheet'], outcome=row['outcome'])
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), row['buckets']):
+                cumulative += count
+                lines.append(f"sheets_api_request_seconds_bucket{_labels(**base, le=bound)} {cumulative}")
+            lines.append(f"sheets_api_request_seconds_sum{_labels(**base)} {row['seconds']}")
+            lines.append(f"sheets_api_request_seconds_count{_labels(**base)} {row['count']}")
+
+        lines += ['# HELP sheets_api_source_runs_total Requests served or page runs per source.',
+                  '# TYPE sheets_api_source_runs_total counter']
+        for source, runs in sorted(snapshot['runs'].items()):
+            lines.append(f"sheets_api_source_runs_total{_labels(source=source)} {runs}")
+        return '\n'.join(lines) + '\n'
+
+
+# One registry per process, like the shared rate limiter
+sheets_metrics = SheetsMetrics()
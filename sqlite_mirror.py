@@ -0,0 +1,198 @@
+# sqlite_mirror.py
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from pathlib import Path
+
+import pandas as pd
+from report_schema import COUNT_COLUMNS, apply_report_schema
+from sheet_utils import column_letter, rowcol_to_a1
+
+
+def values_to_frame(headers, rows, parse_records):
+    """Turn raw sheet rows into a typed report frame"""
+    width = len(headers)
+    records = [dict(zip(headers, list(row) + [''] * (width - len(row)))) for row in rows]
+    return parse_records(records)
+
+
+def values_digest(values):
+    """Hash raw sheet values, to tell whether the sheet changed without parsing it"""
+    text = '\x1e'.join('\x1f'.join(row) for row in values)
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _quote(name):
+    """Quote a sheet header for use as an SQLite identifier"""
+    return '"' + name.replace('"', '""') + '"'
+
+
+class ReportsMirror:
+    """Local SQLite copy of the Reports sheet, kept current by incremental syncs.
+
+    A normal sync reads only the rows below the last mirrored row. A full
+    reconcile replaces the table from the whole sheet, so edits and deletes
+    made in the sheet are picked up; it runs on the first sync, every
+    reconcile_interval seconds, and after mark_dirty(). A reconcile that
+    finds the sheet unchanged (same content hash) keeps the table as is.
+
+    The content version in the database changes whenever mirrored rows do,
+    so every process sharing the file can tell when to reload.
+    """
+
+    def __init__(self, db_path, reconcile_interval=600):
+        self.db_path = Path(db_path)
+        self.reconcile_interval = reconcile_interval
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _get_meta(self, conn, key, default=None):
+        row = conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def _set_meta(self, conn, key, value):
+        conn.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, json.dumps(value)))
+
+    def mark_dirty(self):
+        """Force the next sync to reconcile the whole sheet"""
+        self._dirty = True
+
+    def row_count(self):
+        """Get the number of mirrored report rows"""
+        with closing(self._connect()) as conn:
+            return self._get_meta(conn, 'row_count', 0)
+
+    def content_version(self):
+        """Get the version of the mirrored rows; it changes whenever they do"""
+        with closing(self._connect()) as conn:
+            return self._get_meta(conn, 'content_version', 0)
+
+    def _bump_content_version(self, conn, digest=None):
+        """Record that the mirrored rows changed, with the sheet's content hash if it is known"""
+        self._set_meta(conn, 'content_version', self._get_meta(conn, 'content_version', 0) + 1)
+        self._set_meta(conn, 'digest', digest)
+
+    def sync(self, worksheet, call, parse_records):
+        """Bring the mirror up to date with the worksheet; returns its content version.
+
+        call(kind, fn, *args) performs a rate-limited Sheets call and
+        parse_records(records) turns sheet records into a typed DataFrame.
+        """
+        with self._lock:
+            with closing(self._connect()) as conn:
+                headers = self._get_meta(conn, 'headers')
+                last_reconcile = self._get_meta(conn, 'last_reconcile', 0)
+                row_count = self._get_meta(conn, 'row_count', 0)
+                digest = self._get_meta(conn, 'digest')
+
+            if self._dirty or not headers or time.time() - last_reconcile >= self.reconcile_interval:
+                values = call('read', worksheet.get_all_values)
+                self._dirty = False
+                if values and values_digest(values) == digest:
+                    with closing(self._connect()) as conn, conn:
+                        self._set_meta(conn, 'last_reconcile', time.time())
+                elif not values:
+                    self._replace([], [])
+                else:
+                    self._replace(values[0], values_to_frame(values[0], values[1:], parse_records),
+                                  values_digest(values))
+                return self.content_version()
+
+            # Only rows below the last mirrored one; the row count is the cursor
+            first_row = row_count + 2
+            tail_range = f"{rowcol_to_a1(first_row, 1)}:{column_letter(len(headers))}"
+            rows = call('read', worksheet.get, tail_range)
+            if rows:
+                self._append(headers, row_count, values_to_frame(headers, rows, parse_records))
+            return self.content_version()
+
+    def _table_sql(self, headers):
+        columns = ['row_num INTEGER PRIMARY KEY']
+        for name in headers:
+            col_type = 'INTEGER' if name in COUNT_COLUMNS else 'TEXT'
+            columns.append(f'{_quote(name)} {col_type}')
+        return f"CREATE TABLE reports ({', '.join(columns)})"
+
+    def _rows_for_insert(self, headers, df, start_row):
+        """Convert a typed frame to SQLite rows, numbering them from start_row"""
+        if df.empty:
+            return []
+        df = df.reindex(columns=headers)
+        if 'Date' in df.columns:
+            df['Date'] = df['Date'].dt.strftime('%Y-%m-%d %H:%M:%S')
+        df = df.astype(object).where(df.notna(), None)
+        return [(start_row + i, *values) for i, values in enumerate(df.itertuples(index=False, name=None))]
+
+    def _replace(self, headers, df, digest=None):
+        """Replace the mirrored table with a full copy of the sheet"""
+        with closing(self._connect()) as conn, conn:
+            conn.execute('DROP TABLE IF EXISTS reports')
+            if headers:
+                conn.execute(self._table_sql(headers))
+                self._insert(conn, headers, self._rows_for_insert(headers, df, 1))
+            self._set_meta(conn, 'headers', list(headers))
+            self._set_meta(conn, 'row_count', len(df))
+            self._set_meta(conn, 'last_reconcile', time.time())
+            self._bump_content_version(conn, digest)
+
+    def _append(self, headers, row_count, df):
+        """Add rows appended to the sheet since the last sync"""
+        with closing(self._connect()) as conn, conn:
+            self._insert(conn, headers, self._rows_for_insert(headers, df, row_count + 1))
+            self._set_meta(conn, 'row_count', row_count + len(df))
+            self._bump_content_version(conn)
+
+    def replace_row(self, row_num, df):
+        """Overwrite one mirrored row (1-based, below the header) after an edit"""
+        with self._lock:
+            with closing(self._connect()) as conn, conn:
+                headers = self._get_meta(conn, 'headers')
+                if not headers or row_num > self._get_meta(conn, 'row_count', 0):
+                    # Not mirrored yet; the next tail sync reads it from the sheet
+                    return
+                conn.execute('DELETE FROM reports WHERE row_num = ?', (row_num,))
+                self._insert(conn, headers, self._rows_for_insert(headers, df, row_num))
+                self._bump_content_version(conn)
+
+    def delete_row(self, row_num):
+        """Remove one mirrored row (1-based, below the header) and renumber the rows after it"""
+        with self._lock:
+            with closing(self._connect()) as conn, conn:
+                row_count = self._get_meta(conn, 'row_count', 0)
+                if not self._get_meta(conn, 'headers') or row_num > row_count:
+                    return
+                conn.execute('DELETE FROM reports WHERE row_num = ?', (row_num,))
+                conn.execute('UPDATE reports SET row_num = row_num - 1 WHERE row_num > ?', (row_num,))
+                self._set_meta(conn, 'row_count', row_count - 1)
+                self._bump_content_version(conn)
+
+    def _insert(self, conn, headers, rows):
+        placeholders = ', '.join(['?'] * (len(headers) + 1))
+        conn.executemany(f'INSERT INTO reports VALUES ({placeholders})', rows)
+
+    def load_reports(self):
+        """Get every mirrored report in sheet order.
+
+        The whole table is loaded because DataProcessor filters the sorted
+        frame in pandas (date ranges by binary search), so there are no
+        filtered reads here and no indexes to serve them.
+        """
+        with closing(self._connect()) as conn:
+            headers = self._get_meta(conn, 'headers')
+            if not headers:
+                return pd.DataFrame()
+            df = pd.read_sql_query('SELECT * FROM reports ORDER BY row_num', conn)
+
+        # Labels match the positional index of a sheet read (row_num is 1-based)
+        df.index = df.pop('row_num') - 1
+        df.index.name = None
+        return apply_report_schema(df, date_format='%Y-%m-%d %H:%M:%S')
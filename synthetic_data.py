@@ -0,0 +1,205 @@
+# synthetic_data.py
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from data_processor import DataProcessor
+from google_sheets_service import REPORT_HEADERS, new_report_id
+from report_schema import apply_report_schema, concat_reports
+
+TELECALLER_NAMES = ['Prakriti', 'Raphiya', 'Sudikshya', 'Shiru']
+WEEKDAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+# Destination countries and how often a report names one ('' = none recorded)
+COUNTRIES = ['', 'UK', 'Australia', 'Canada', 'USA', 'New Zealand', 'Other']
+COUNTRY_WEIGHTS = [0.62, 0.1, 0.1, 0.07, 0.05, 0.03, 0.03]
+
+VIDEO_DETAILS = ['TikTok video', 'Instagram reel', 'Student testimonial', 'University info video']
+OTHER_WORK = ['', 'Counselling walk-ins', 'Event preparation', 'Data cleanup', 'Document follow-ups']
+OTHER_WORK_WEIGHTS = [0.7, 0.1, 0.06, 0.08, 0.06]
+REMARKS = ['', 'Good day', 'Many call backs pending', 'Network issues', 'Half day']
+REMARK_WEIGHTS = [0.75, 0.1, 0.07, 0.05, 0.03]
+
+
+def telecaller_names(count):
+    """Get count telecaller names, the real ones first"""
+    names = TELECALLER_NAMES[:count]
+    return names + [f'Telecaller {i + 1}' for i in range(len(names), count)]
+
+
+def _pick(rng, values, weights, size):
+    """Draw size labels from values as an object array sharing one string object per label"""
+    codes = rng.choice(len(values), size=size, p=weights)
+    return np.asarray(values, dtype=object)[codes]
+
+
+def generate_reports(telecallers=4, days=90, seed=42, end_date=None, absence_rate=0.08):
+    """Generate one report per telecaller per day, in sheet order and the canonical schema.
+
+    Every telecaller has their own typical call volume, conversion and CRM
+    rates; daily values vary around them, Saturdays are short days and about
+    absence_rate of telecaller-days have no report at all. The same seed
+    always gives the same frame (IDs included), relative to end_date.
+    """
+    rng = np.random.default_rng(seed)
+    end = pd.Timestamp(end_date or datetime.now().date()).normalize()
+    dates = pd.date_range(end=end, periods=days, freq='D')
+    names = telecaller_names(telecallers)
+
+    # One candidate row per (day, telecaller), oldest day first as in the sheet
+    day_idx = np.repeat(np.arange(days), telecallers)
+    tc_idx = np.tile(np.arange(telecallers), days)
+    present = rng.random(len(day_idx)) >= absence_rate
+    day_idx, tc_idx = day_idx[present], tc_idx[present]
+    n = len(day_idx)
+
+    # Per-telecaller habits
+    typical_calls = rng.lognormal(np.log(110), 0.35, telecallers)
+    conversion = rng.beta(3, 12, telecallers)
+    crm_rate = rng.beta(8, 3, telecallers)
+
+    weekday = dates.dayofweek.values[day_idx]
+    day_factor = np.where(weekday == 5, 0.3, 1.0)
+    total_calls = rng.poisson(typical_calls[tc_idx] * day_factor)
+    video = rng.random(n) < 0.12
+
+    df = pd.DataFrame({
+        # Reports are saved with the time of entry; one second past midnight keeps them on their day
+        'Date': dates.values[day_idx] + np.timedelta64(1, 's'),
+        'Telecaller': pd.Categorical.from_codes(tc_idx, names),
+        'Day': pd.Categorical.from_codes(weekday, WEEKDAYS),
+        'Total Calls': total_calls.astype('int32'),
+        'New Data': rng.binomial(total_calls, conversion[tc_idx]).astype('int32'),
+        'CRM Data': rng.binomial(total_calls, crm_rate[tc_idx]).astype('int32'),
+        'Country Data': pd.Categorical.from_codes(rng.choice(len(COUNTRIES), n, p=COUNTRY_WEIGHTS), COUNTRIES),
+        # Fair data only comes in on education fair days
+        'Fair Data': np.where(rng.random(n) < 0.05, rng.poisson(25, n), 0).astype('int32'),
+        'Video': pd.Categorical.from_codes(video.astype('int8'), ['No', 'Yes']),
+        'Video Details': np.where(video, _pick(rng, VIDEO_DETAILS, None, n), ''),
+        'Other Work Description': _pick(rng, OTHER_WORK, OTHER_WORK_WEIGHTS, n),
+        'Visited Students': rng.poisson(1.5, n).astype('int32'),
+        'Remarks': _pick(rng, REMARKS, REMARK_WEIGHTS, n),
+        'ID': pd.Series(rng.integers(0, 2 ** 60, n)).map('r{:015x}'.format).values,
+    }, columns=REPORT_HEADERS)
+    return df
+
+
+class StaticReportsService:
+    """In-memory stand-in for GoogleSheetsService that serves a generated report frame.
+
+    Writes change only the in-memory frame, with the same version and
+    epoch bookkeeping as the real snapshot, so processors, caches and
+    HTTP validators behave as they do against a sheet.
+    """
+
+    spreadsheet = None
+
+    def __init__(self, reports_df):
+        self._reports_df = reports_df.reset_index(drop=True)
+        self.data_version = 1
+        self.reports_epoch = 1
+        self._edit_logs = []
+        self._users = {}
+
+    def get_all_reports(self, force_refresh=False):
+        return self._reports_df
+
+    def get_reports_version(self):
+        return self.data_version
+
+    def seed_reports(self, df):
+        self._reports_df = df.reset_index(drop=True)
+        self.data_version += 1
+        self.reports_epoch += 1
+
+    def invalidate_reports_cache(self):
+        pass
+
+    def flush_pending_writes(self, timeout=None):
+        return True
+
+    def close(self):
+        pass
+
+    def get_sheet_names(self):
+        return []
+
+    def check_connection(self):
+        return {'google_sheets': False, 'worksheets': [], 'local_mode': True}
+
+    def _report_frame(self, report_data, report_id):
+        """Build a one-row canonical frame from report form data"""
+        record = {
+            'Date': report_data.get('date', ''),
+            'Telecaller': report_data.get('telecaller', ''),
+            'Day': report_data.get('day', ''),
+            'Total Calls': report_data.get('total_calls', 0),
+            'New Data': report_data.get('new_data', 0),
+            'CRM Data': report_data.get('crm_data', 0),
+            'Country Data': report_data.get('country_data', ''),
+            'Fair Data': report_data.get('fair_data', 0),
+            'Video': report_data.get('video', 'No'),
+            'Video Details': report_data.get('video_details', ''),
+            'Other Work Description': report_data.get('other_work', ''),
+            'Visited Students': report_data.get('visited_students', 0),
+            'Remarks': report_data.get('remarks', ''),
+            'ID': report_id,
+        }
+        return apply_report_schema(pd.DataFrame([record]), date_format='%d/%m/%Y %H:%M:%S')
+
+    def _position(self, report_id):
+        matches = np.flatnonzero(self._reports_df['ID'].values == report_id)
+        return int(matches[0]) if len(matches) else None
+
+    def add_report(self, report_data):
+        report_id = new_report_id()
+        self._reports_df = concat_reports([self._reports_df, self._report_frame(report_data, report_id)])
+        self.data_version += 1
+        return report_id
+
+    def update_report(self, report_id, report_data):
+        position = self._position(report_id)
+        if position is None:
+            return False
+        updated = self._report_frame(report_data, report_id)
+        self._reports_df = concat_reports([self._reports_df.iloc[:position], updated,
+                                           self._reports_df.iloc[position + 1:]])
+        self.data_version += 1
+        self.reports_epoch += 1
+        return True
+
+    def delete_report(self, report_id):
+        position = self._position(report_id)
+        if position is None:
+            return False
+        self._reports_df = self._reports_df.drop(index=position).reset_index(drop=True)
+        self.data_version += 1
+        self.reports_epoch += 1
+        return True
+
+    def log_edit_action(self, edit_log):
+        self._edit_logs.append(edit_log)
+        return True
+
+    def get_edit_logs(self):
+        return pd.DataFrame(self._edit_logs)
+
+    def get_users(self):
+        return dict(self._users)
+
+    def save_users(self, users):
+        self._users = dict(users)
+        return True
+
+    def save_user(self, username, user_data):
+        self._users[username] = user_data
+        return True
+
+
+class SyntheticProcessor(DataProcessor):
+    """DataProcessor over generated reports; drives the mock API, benchmarks and load tests"""
+
+    def __init__(self, telecallers=4, days=90, seed=42, end_date=None):
+        reports = generate_reports(telecallers=telecallers, days=days, seed=seed, end_date=end_date)
+        super().__init__(gs_service=StaticReportsService(reports), use_snapshot=False)
@@ -0,0 +1,42 @@
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from data_processor import DASHBOARD_RANGES, DataProcessor  # noqa: E402
+from synthetic_data import StaticReportsService, generate_reports  # noqa: E402
+
+
+class DashboardStatsMultiTest(unittest.TestCase):
+    """The one-pass multi-range stats match get_dashboard_stats exactly"""
+
+    @classmethod
+    def setUpClass(cls):
+        reports = generate_reports(telecallers=6, days=120, seed=7)
+        cls.processor = DataProcessor(gs_service=StaticReportsService(reports), use_snapshot=False)
+        cls.multi = cls.processor.get_dashboard_stats_multi(by_telecaller=True)
+
+    def assertSameStats(self, multi, single):
+        self.assertEqual(multi, single)
+        for key, value in multi.items():
+            # numpy scalars would round and serialize differently
+            self.assertIn(type(value), (int, float), key)
+
+    def test_ranges_match(self):
+        for time_range in DASHBOARD_RANGES:
+            with self.subTest(time_range=time_range):
+                self.assertSameStats(self.multi['ranges'][time_range],
+                                     self.processor.get_dashboard_stats(time_range))
+
+    def test_every_telecaller_matches(self):
+        self.assertEqual(len(self.multi['telecallers']), 6)
+        for telecaller, ranges in self.multi['telecallers'].items():
+            for time_range in DASHBOARD_RANGES:
+                with self.subTest(telecaller=telecaller, time_range=time_range):
+                    self.assertSameStats(ranges[time_range],
+                                         self.processor.get_dashboard_stats(time_range, telecaller))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import fake_sheets  # noqa: E402
+import google_sheets_service  # noqa: E402
+from google_sheets_service import REPORT_ID_COL, GoogleSheetsService, new_report_id  # noqa: E402
+from synthetic_data import generate_reports  # noqa: E402
+
+# IDs of the old uuid4().hex[:16] form that gspread would numericise
+NUMERIC_LOOKING_IDS = ['1234567890123456', '1234e56789012345', '0123456789012345']
+
+REPORT = {'date': '17/10/2026 10:00:00', 'telecaller': 'Prakriti', 'day': 'Saturday', 'total_calls': 9}
+
+
+class NumericLookingIdTest(unittest.TestCase):
+    """Reports read straight from the sheet (no mirror) keep their IDs exactly"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.data_dir = os.environ.get('DATA_DIR')
+        os.environ['DATA_DIR'] = self.tmp.name
+        self.settings = (google_sheets_service.REPORTS_MIRROR_ENABLED, google_sheets_service.WRITE_BEHIND_ENABLED)
+        google_sheets_service.REPORTS_MIRROR_ENABLED = False
+        google_sheets_service.WRITE_BEHIND_ENABLED = False
+
+        backend = fake_sheets.FakeBackend(seed=1)
+        self.worksheet = fake_sheets.seed_reports(backend, generate_reports(telecallers=2, days=5))
+        for row, report_id in enumerate(NUMERIC_LOOKING_IDS, start=1):
+            self.worksheet._rows[row][REPORT_ID_COL - 1] = report_id
+        self.service = GoogleSheetsService(client=fake_sheets.FakeClient(backend))
+        self.addCleanup(self.service.close)
+
+    def tearDown(self):
+        google_sheets_service.REPORTS_MIRROR_ENABLED, google_sheets_service.WRITE_BEHIND_ENABLED = self.settings
+        if self.data_dir is None:
+            os.environ.pop('DATA_DIR', None)
+        else:
+            os.environ['DATA_DIR'] = self.data_dir
+
+    def test_ids_round_trip(self):
+        ids = list(self.service.get_all_reports()['ID'][:len(NUMERIC_LOOKING_IDS)])
+        self.assertEqual(ids, NUMERIC_LOOKING_IDS)
+        for report_id in NUMERIC_LOOKING_IDS:
+            self.assertTrue(self.service.update_report(report_id, REPORT), report_id)
+            self.assertTrue(self.service.delete_report(report_id), report_id)
+        remaining = set(self.service.get_all_reports(force_refresh=True)['ID'])
+        self.assertFalse(remaining & set(NUMERIC_LOOKING_IDS))
+
+    def test_new_ids_are_never_numeric(self):
+        for _ in range(1000):
+            report_id = new_report_id()
+            self.assertEqual(fake_sheets._numericise(report_id), report_id)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import fake_sheets  # noqa: E402
+import google_sheets_service  # noqa: E402
+from data_processor import DataProcessor  # noqa: E402
+from google_sheets_service import GoogleSheetsService  # noqa: E402
+from report_refresher import ReportRefresher  # noqa: E402
+from synthetic_data import generate_reports  # noqa: E402
+
+REPORT = {'date': '17/10/2026 10:00:00', 'telecaller': 'Prakriti', 'day': 'Saturday', 'total_calls': 7}
+
+
+class ReportRefresherTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        # Registered first so it runs after the services are closed
+        self.addCleanup(self.tmp.cleanup)
+        self.data_dir = os.environ.get('DATA_DIR')
+        os.environ['DATA_DIR'] = self.tmp.name
+        self.flush_seconds = google_sheets_service.WRITE_BEHIND_FLUSH_SECONDS
+        google_sheets_service.WRITE_BEHIND_FLUSH_SECONDS = 60
+
+        self.backend = fake_sheets.FakeBackend(seed=1)
+        fake_sheets.seed_reports(self.backend, generate_reports(telecallers=2, days=30))
+        self.service = GoogleSheetsService(client=fake_sheets.FakeClient(self.backend))
+        self.processor = DataProcessor(gs_service=self.service, use_snapshot=False)
+        self.addCleanup(self.processor.close)
+        self.refresher = ReportRefresher(self.processor, interval=60)
+
+    def tearDown(self):
+        google_sheets_service.WRITE_BEHIND_FLUSH_SECONDS = self.flush_seconds
+        if self.data_dir is None:
+            os.environ.pop('DATA_DIR', None)
+        else:
+            os.environ['DATA_DIR'] = self.data_dir
+
+    def sheet(self):
+        return self.backend.spreadsheet(title=fake_sheets.DEFAULT_TITLE).worksheet('Reports')
+
+    def append_remote_report(self, report_id):
+        self.sheet().append_row(['18/10/2026 09:00:00', 'Shiru', 'Sunday', '1'] + [''] * 9 + [report_id])
+
+    def report_ids(self):
+        return set(self.processor.get_all_reports()['ID'])
+
+    def test_publishes_prebuilt_aggregates_and_skips_unchanged_sheet(self):
+        self.assertTrue(self.refresher.refresh_now())
+        version = self.processor.data_version
+        self.assertEqual(self.processor._cube_version, version)
+        self.backend.reset_stats()
+        self.assertFalse(self.refresher.refresh_now())
+        self.assertEqual(self.processor.data_version, version)
+        # Only the mirror's tail read, not the whole sheet
+        self.assertEqual(self.backend.stats()['methods'], {'get': 1})
+
+    def test_remote_append_is_published_from_the_tail_read(self):
+        self.refresher.refresh_now()
+        self.append_remote_report('remote0000000001')
+        self.backend.reset_stats()
+        self.assertTrue(self.refresher.refresh_now())
+        self.assertIn('remote0000000001', self.report_ids())
+        self.assertNotIn('get_all_values', self.backend.stats()['methods'])
+
+    def test_report_added_during_a_poll_is_not_dropped(self):
+        self.refresher.refresh_now()
+        worksheet = self.service.reports_ws
+        read = worksheet.get
+        added = []
+
+        def read_then_add(*args, **kwargs):
+            values = read(*args, **kwargs)
+            if not added:
+                added.append(self.processor.add_report(REPORT))
+            return values
+        worksheet.get = read_then_add
+        self.append_remote_report('remote0000000001')
+
+        self.assertTrue(self.refresher.refresh_now())
+        self.assertIn(added[0], self.report_ids())
+        self.assertIn('remote0000000001', self.report_ids())
+
+    def test_stale_poll_is_not_published(self):
+        self.refresher.refresh_now()
+        self.append_remote_report('remote0000000001')
+        poll = self.service.poll_reports()
+        self.processor.add_report(REPORT)
+        self.assertFalse(self.processor.publish_reports(poll))
+
+
+if __name__ == '__main__':
+    unittest.main()
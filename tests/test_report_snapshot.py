@@ -0,0 +1,53 @@
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import data_processor  # noqa: E402
+from data_processor import DataProcessor  # noqa: E402
+from report_snapshot import load_snapshot, write_snapshot  # noqa: E402
+from synthetic_data import StaticReportsService, generate_reports  # noqa: E402
+
+REPORT = {'date': '17/10/2026 10:00:00', 'telecaller': 'Prakriti', 'day': 'Saturday', 'total_calls': 7}
+
+
+class ReportSnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = Path(self.tmp.name) / 'reports_snapshot.parquet'
+        self.reports = generate_reports(telecallers=3, days=20)
+
+    def test_concurrent_writes_leave_a_whole_snapshot(self):
+        results = []
+
+        def write():
+            results.append(write_snapshot(self.reports, self.path))
+        threads = [threading.Thread(target=write) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, [True] * 8)
+        self.assertEqual(len(load_snapshot(self.path)), len(self.reports))
+        self.assertEqual(os.listdir(self.tmp.name), [self.path.name])
+
+    def test_local_add_does_not_rewrite_the_snapshot(self):
+        with mock.patch.dict(os.environ, {'REPORTS_SNAPSHOT': str(self.path)}):
+            processor = DataProcessor(gs_service=StaticReportsService(self.reports))
+        with mock.patch.object(data_processor, 'write_snapshot', wraps=write_snapshot) as writes:
+            processor.get_all_reports()
+            self.assertEqual(writes.call_count, 1)
+            processor.add_report(REPORT)
+            self.assertEqual(len(processor.get_all_reports()), len(self.reports) + 1)
+            self.assertEqual(writes.call_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
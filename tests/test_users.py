@@ -0,0 +1,71 @@
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import fake_sheets  # noqa: E402
+from google_sheets_service import GoogleSheetsService  # noqa: E402
+
+
+def user(name, role='telecaller'):
+    return {'password': 'x', 'role': role, 'name': name, 'permissions': {}, 'is_active': True}
+
+
+class SaveUserTest(unittest.TestCase):
+    """Single-user saves stay correct when another process rewrote the Users sheet"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.data_dir = os.environ.get('DATA_DIR')
+        os.environ['DATA_DIR'] = self.tmp.name
+
+        backend = fake_sheets.FakeBackend(seed=1)
+        self.spreadsheet = backend.spreadsheet(title=fake_sheets.DEFAULT_TITLE)
+        self.ours = self.make_service(backend)
+        self.theirs = self.make_service(backend)
+        self.ours.save_users({'admin': user('Admin', 'admin'), 'asha': user('Asha'), 'bina': user('Bina')})
+        self.ours.get_users()
+
+    def tearDown(self):
+        if self.data_dir is None:
+            os.environ.pop('DATA_DIR', None)
+        else:
+            os.environ['DATA_DIR'] = self.data_dir
+
+    def make_service(self, backend):
+        service = GoogleSheetsService(client=fake_sheets.FakeClient(backend))
+        self.addCleanup(service.close)
+        return service
+
+    def usernames(self):
+        return [row[0] for row in self.spreadsheet.worksheet('Users').get_all_values()[1:]]
+
+    def test_save_after_another_process_removed_a_user(self):
+        # Another process deletes asha, so bina moves up a row
+        self.theirs.save_users({'admin': user('Admin', 'admin'), 'bina': user('Bina')})
+        self.assertTrue(self.ours.save_user('bina', user('Bina Renamed')))
+
+        users = self.theirs.get_users()
+        self.assertEqual(self.usernames(), ['admin', 'bina'])
+        self.assertEqual(users['bina']['name'], 'Bina Renamed')
+        self.assertEqual(users['admin']['name'], 'Admin')
+
+    def test_save_of_a_user_another_process_added(self):
+        self.theirs.save_user('chandra', user('Chandra'))
+        self.assertTrue(self.ours.save_user('chandra', user('Chandra Updated')))
+
+        self.assertEqual(self.usernames(), ['admin', 'asha', 'bina', 'chandra'])
+        self.assertEqual(self.theirs.get_users()['chandra']['name'], 'Chandra Updated')
+
+    def test_save_users_clears_rows_another_process_added(self):
+        self.theirs.save_user('chandra', user('Chandra'))
+        self.assertTrue(self.ours.save_users({'admin': user('Admin', 'admin')}))
+        self.assertEqual(self.usernames(), ['admin'])
+
+
+if __name__ == '__main__':
+    unittest.main()
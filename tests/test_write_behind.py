@@ -0,0 +1,122 @@
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import fake_sheets  # noqa: E402
+import google_sheets_service  # noqa: E402
+from google_sheets_service import GoogleSheetsService  # noqa: E402
+from synthetic_data import generate_reports  # noqa: E402
+from write_behind import WriteBehindQueue  # noqa: E402
+
+
+class RecordingAppender:
+    def __init__(self, fail=False):
+        self.batches = []
+        self.fail = fail
+
+    def __call__(self, worksheet_name, rows):
+        if self.fail:
+            raise RuntimeError('sheet unavailable')
+        self.batches.append((worksheet_name, rows))
+
+    def rows(self):
+        return [row for _, rows in self.batches for row in rows]
+
+
+class WriteBehindQueueTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        # Registered first so it runs after the queues are closed
+        self.addCleanup(self.tmp.cleanup)
+        self.journal = Path(self.tmp.name) / 'pending_sheet_writes.jsonl'
+
+    def make_queue(self, appender):
+        queue = WriteBehindQueue(appender, self.journal, flush_interval=60)
+        self.addCleanup(queue.close)
+        return queue
+
+    def test_second_queue_does_not_replay_live_rows(self):
+        first_appender, second_appender = RecordingAppender(), RecordingAppender()
+        first = self.make_queue(first_appender)
+        first.put('Reports', ['a'])
+        second = self.make_queue(second_appender)
+        second.put('Reports', ['b'])
+
+        first.close()
+        second.close()
+        self.assertEqual(first_appender.rows(), [['a']])
+        self.assertEqual(second_appender.rows(), [['b']])
+        self.assertEqual(list(Path(self.tmp.name).iterdir()), [])
+
+    def test_legacy_journal_is_adopted_once(self):
+        self.journal.write_text('{"worksheet": "Reports", "row": ["old"]}\n')
+        first_appender, second_appender = RecordingAppender(), RecordingAppender()
+        first = self.make_queue(first_appender)
+        second = self.make_queue(second_appender)
+
+        first.close()
+        second.close()
+        self.assertEqual(first_appender.rows() + second_appender.rows(), [['old']])
+
+    def test_unwritten_rows_are_left_for_the_next_queue(self):
+        failing = self.make_queue(RecordingAppender(fail=True))
+        failing.put('EditHistory', ['x'])
+        failing.close()
+
+        appender = RecordingAppender()
+        self.make_queue(appender).close()
+        self.assertEqual(appender.batches, [('EditHistory', [['x']])])
+
+
+class TwoServicesTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        # Registered first so it runs after the services are closed
+        self.addCleanup(self.tmp.cleanup)
+        self.env = {'DATA_DIR': os.environ.get('DATA_DIR')}
+        os.environ['DATA_DIR'] = self.tmp.name
+        self.flush_seconds = google_sheets_service.WRITE_BEHIND_FLUSH_SECONDS
+        google_sheets_service.WRITE_BEHIND_FLUSH_SECONDS = 60
+
+        self.backend = fake_sheets.FakeBackend(seed=1)
+        fake_sheets.seed_reports(self.backend, generate_reports(telecallers=2, days=5))
+        self.spreadsheet = self.backend.spreadsheet(title=fake_sheets.DEFAULT_TITLE)
+
+    def tearDown(self):
+        google_sheets_service.WRITE_BEHIND_FLUSH_SECONDS = self.flush_seconds
+        for name, value in self.env.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+    def make_service(self):
+        service = GoogleSheetsService(client=fake_sheets.FakeClient(self.backend))
+        self.addCleanup(service.close)
+        return service
+
+    def column(self, worksheet, header):
+        rows = self.spreadsheet.worksheet(worksheet).get_all_values()
+        index = rows[0].index(header)
+        return [row[index] for row in rows[1:]]
+
+    def test_report_queued_before_a_second_service_starts_is_written_once(self):
+        first = self.make_service()
+        report_id = first.add_report({'date': '17/10/2026 10:00:00', 'telecaller': 'Prakriti',
+                                      'day': 'Saturday', 'total_calls': 7})
+        # What Refresh All Data does: a new service while the old one still has queued rows
+        second = self.make_service()
+        second.flush_pending_writes()
+        first.close()
+        second.close()
+
+        self.assertEqual(self.column('Reports', 'ID').count(report_id), 1)
+        self.assertEqual(self.column('EditHistory', 'action').count('ADD'), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,210 @@
+# write_behind.py
+import atexit
+import json
+import logging
+import os
+import threading
+import uuid
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+
+def _try_lock(path):
+    """Take an exclusive lock on path without waiting; returns the open file, or None if it is held"""
+    f = open(path, 'a+b')
+    try:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        f.close()
+        return None
+    return f
+
+
+def _lock_path(journal_path):
+    return journal_path.with_name(journal_path.name + '.lock')
+
+
+class WriteBehindQueue:
+    """Collects rows bound for sheet appends and writes them in batches off the request path.
+
+    Every queued row is journaled to a local file before put() returns, and
+    removed from the journal once its batch has been written, so rows pending
+    at a crash are replayed on the next start. Delivery is at-least-once: a
+    crash between a successful append and the journal rewrite can repeat rows.
+
+    Each queue owns its own journal, named after journal_path, and holds a
+    lock on it while open. A new queue adopts only the journals nobody holds
+    (left by a crash or a queue closed with rows it could not write), so
+    several queues in one process, or processes sharing a data directory,
+    never replay or overwrite each other's rows.
+    """
+
+    def __init__(self, append_rows, journal_path, max_batch=20, flush_interval=2.0):
+        # append_rows(worksheet_name, rows) performs one batched append
+        self._append_rows = append_rows
+        base_path = Path(journal_path)
+        self.journal_path = base_path.with_name(f"{base_path.stem}.{uuid.uuid4().hex[:12]}{base_path.suffix}")
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+
+        self._pending = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+
+        self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock_file = _try_lock(_lock_path(self.journal_path))
+        self._adopt_journals(base_path)
+
+        self._thread = threading.Thread(target=self._run, name='sheets-write-behind', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def put(self, worksheet_name, row):
+        """Queue a row to be appended to the named worksheet"""
+        with self._lock:
+            self._pending.append((worksheet_name, list(row)))
+            with open(self.journal_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps({'worksheet': worksheet_name, 'row': list(row)}) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            pending = len(self._pending)
+
+        if pending >= self.max_batch:
+            self._wakeup.set()
+
+    def pending_count(self, worksheet_name=None):
+        """Get the number of rows still waiting to be written"""
+        with self._lock:
+            if worksheet_name is None:
+                return len(self._pending)
+            return sum(1 for name, _ in self._pending if name == worksheet_name)
+
+    def flush(self):
+        """Write all pending rows now, one append per worksheet; returns True if nothing is left"""
+        with self._flush_lock:
+            with self._lock:
+                batch = list(self._pending)
+            if not batch:
+                return True
+
+            # Coalesce rows per worksheet, keeping their queue order
+            grouped = {}
+            for worksheet_name, row in batch:
+                grouped.setdefault(worksheet_name, []).append(row)
+
+            written = set()
+            for worksheet_name, rows in grouped.items():
+                try:
+                    self._append_rows(worksheet_name, rows)
+                    written.add(worksheet_name)
+                except Exception as e:
+                    logger.error(f"Error writing {len(rows)} queued rows to {worksheet_name}: {str(e)}")
+
+            with self._lock:
+                remaining = [item for item in batch if item[0] not in written]
+                self._pending = remaining + self._pending[len(batch):]
+                self._rewrite_journal()
+                return not self._pending
+
+    def close(self):
+        """Stop the background thread, write whatever is still pending and release the journal"""
+        if self._closed:
+            return
+        self._closed = True
+        atexit.unregister(self.close)
+        self._wakeup.set()
+        self._thread.join(timeout=self.flush_interval + 5)
+        self.flush()
+        with self._lock:
+            if not self._pending:
+                self.journal_path.unlink(missing_ok=True)
+            else:
+                logger.warning(f"{len(self._pending)} queued sheet rows left in {self.journal_path} for the next start")
+            self._release(self.journal_path, self._lock_file)
+            self._lock_file = None
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def _run(self):
+        """Flush when the batch is full or the flush interval has passed"""
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            if self._closed:
+                break
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Error flushing write-behind queue: {str(e)}")
+
+    def _adopt_journals(self, base_path):
+        """Take over the rows of journals whose queue is gone, so they are written by this one"""
+        for path in sorted(base_path.parent.glob(f"{base_path.stem}*{base_path.suffix}")):
+            if path == self.journal_path:
+                continue
+            lock_file = _try_lock(_lock_path(path))
+            if lock_file is None:
+                # Owned by a live queue, here or in another process
+                continue
+            rows = self._read_journal(path)
+            if rows:
+                logger.info(f"Replaying {len(rows)} queued sheet rows from {path}")
+                with self._lock:
+                    self._pending.extend(rows)
+                    # Journaled as ours before the orphan goes away
+                    self._rewrite_journal()
+            path.unlink(missing_ok=True)
+            self._release(path, lock_file)
+
+    def _read_journal(self, path):
+        """Read the rows of a journal"""
+        rows = []
+        try:
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        item = json.loads(line)
+                        rows.append((item['worksheet'], item['row']))
+                    except (ValueError, KeyError):
+                        # A torn last line from a crash mid-write
+                        continue
+        except FileNotFoundError:
+            # Adopted by another queue after the directory listing
+            pass
+        return rows
+
+    def _release(self, journal_path, lock_file):
+        """Unlock a journal; its lock file is removed once the journal itself is gone"""
+        if lock_file is None:
+            return
+        lock_file.close()
+        if not journal_path.exists():
+            try:
+                _lock_path(journal_path).unlink(missing_ok=True)
+            except OSError:
+                pass
+
+    def _rewrite_journal(self):
+        """Replace the journal with the rows that are still pending"""
+        tmp_path = self.journal_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for worksheet_name, row in self._pending:
+                f.write(json.dumps({'worksheet': worksheet_name, 'row': row}) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.journal_path)